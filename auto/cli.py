@@ -7,23 +7,123 @@ import os
 from pathlib import Path
 import json
 import shutil
+import functools
+import importlib.util
 import datetime
 import re
+import csv
+import io
+import math
+import webbrowser
+from array import array
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
 
+# Rich is only imported once something is actually printed through it; importing it
+# eagerly is a large share of CLI startup for commands that barely use it
+HAS_RICH = importlib.util.find_spec("rich") is not None
+if not HAS_RICH:
+    print("Rich library not found. Install it for better display: pip install rich")
+
+# orjson decodes noticeably faster than the stdlib; its errors subclass JSONDecodeError
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# ijson parses Jaeger trace listings as they stream in instead of buffering the
+# whole (often multi-MB) payload before decoding it
 try:
+    import ijson
+    JSON_DECODE_ERRORS = (json.JSONDecodeError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+@functools.lru_cache(maxsize=None)
+def get_console():
+    """Return the shared Rich console, importing Rich on first use"""
     from rich.console import Console
+    return Console()
+
+@functools.lru_cache(maxsize=None)
+def get_http_session():
+    """Return a shared keep-alive HTTP session for talking to local APIs"""
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+def make_table(**kwargs):
+    """Create a Rich table, importing Rich on first use"""
     from rich.table import Table
-    from rich.progress import Progress
-    HAS_RICH = True
-except ImportError:
-    HAS_RICH = False
-    print("Rich library not found. Install it for better display: pip install rich")
+    return Table(**kwargs)
+
+def iter_jaeger_traces(response):
+    """Yield traces from a streamed Jaeger /api/traces response one at a time"""
+    if ijson is None:
+        yield from json_loads(response.content).get("data") or []
+        return
+    response.raw.decode_content = True
+    yield from ijson.items(response.raw, "data.item", use_float=True)
+
+def trace_service_map(trace):
+    """Map each processID in a Jaeger trace to its service name"""
+    return {pid: process.get("serviceName", "unknown") for pid, process in (trace.get("processes") or {}).items()}
+
+class TraceSummary(NamedTuple):
+    """Per-trace figures shared by query-traces and trace-summary"""
+    trace_id: str
+    span_count: int
+    duration_ms: float
+    services: Counter
+    operations: dict  # Distinct operation names in first-seen order (values unused)
+    start_time_us: Optional[int]
+    error_count: int
 
-# Initialize Rich console if available
-if HAS_RICH:
-    console = Console()
-else:
-    console = None
+def summarize_trace(trace):
+    """Reduce a Jaeger trace to the figures the trace commands report, in one pass over its spans"""
+    svc_of = trace_service_map(trace)
+    spans = trace.get("spans") or []
+    
+    max_duration = 0
+    start_time = None
+    operations = {}
+    error_count = 0
+    for span in spans:
+        max_duration = max(max_duration, span.get("duration", 0))
+        
+        # Track start time (lowest timestamp)
+        span_start = span.get("startTime", 0)
+        if start_time is None or span_start < start_time:
+            start_time = span_start
+        
+        operations[span.get("operationName", "unknown")] = None
+        
+        # Check for errors
+        if any(tag.get("key") == "error" and tag.get("value") == "true" for tag in span.get("tags") or ()):
+            error_count += 1
+    
+    # Spans per service; spans whose process isn't listed are skipped
+    services = Counter(svc_of[span["processID"]] for span in spans if span.get("processID") in svc_of)
+    
+    return TraceSummary(
+        trace_id=trace.get("traceID", "Unknown"),
+        span_count=len(spans),
+        duration_ms=max_duration / 1000,  # Convert μs to ms
+        services=services,
+        operations=operations,
+        start_time_us=start_time,
+        error_count=error_count,
+    )
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -31,86 +131,143 @@ COMPOSE_DEV = PROJECT_ROOT / "docker-compose.dev.yml"
 COMPOSE_PROD = PROJECT_ROOT / "docker-compose.prod.yml"
 COMPOSE_MONITORING = PROJECT_ROOT / "docker-compose-monitoring.yml"
 COMPOSE_TRACING = PROJECT_ROOT / "docker-compose-tracing.yml"
+# One-off SQL migrations for databases created before a schema change
+MIGRATIONS_DIR = PROJECT_ROOT / "services" / "db" / "migrations"
+
+# Compose overrides carrying each service's sampler settings, written by
+# `sampling-rate` and layered onto the dev stack once they exist
+SAMPLING_OVERRIDE_FILES = {
+    "api": PROJECT_ROOT / "docker-compose.override.sampling-api.yml",
+    "frontend": PROJECT_ROOT / "docker-compose.override.sampling-frontend.yml",
+}
+
+API_HEALTH_URL = "http://localhost:8000/health"
+JAEGER_URL = "http://localhost:16686"
+
+# Compose and env files per environment
+COMPOSE_FILES = {"dev": COMPOSE_DEV, "prod": COMPOSE_PROD}
+ENV_FILES = {"dev": ".env.dev", "prod": ".env.prod"}
+
+# Above this many services the dependency graph is laid out with sfdp instead of dot
+LARGE_GRAPH_NODES = 50
+
+# Third-party images that `scan` leaves to their upstream maintainers
+SCAN_SKIP_PREFIXES = ('prom/', 'grafana/', 'redis:', 'postgres:')
+
+# How long a Jaeger availability probe stays valid, in seconds
+JAEGER_PROBE_TTL = 5
+
+# Latency reported by a single `ping -c 1`
+PING_LATENCY_RE = re.compile(r"time=(\d+\.\d+) ms")
+
+# Every metric `benchmark` reads from ab's report, matched in a single pass
+AB_METRICS_RE = re.compile(
+    r"Requests per second:\s+(?P<rps>[\d.]+)"
+    r"|Time per request:\s+(?P<time_per_request>[\d.]+)"
+    r"|^\s*(?P<pct>50|95|99)%\s+(?P<pct_value>\d+)",
+    re.MULTILINE,
+)
 
 def print_info(message):
     """Print info message with nice formatting if Rich is available"""
     if HAS_RICH:
-        console.print(f"[blue]{message}[/blue]")
+        get_console().print(f"[blue]{message}[/blue]")
     else:
         print(f"INFO: {message}")
 
 def print_success(message):
     """Print success message with nice formatting if Rich is available"""
     if HAS_RICH:
-        console.print(f"[green]✅ {message}[/green]")
+        get_console().print(f"[green]✅ {message}[/green]")
     else:
         print(f"SUCCESS: {message}")
 
 def print_error(message):
     """Print error message with nice formatting if Rich is available"""
     if HAS_RICH:
-        console.print(f"[bold red]❌ {message}[/bold red]")
+        get_console().print(f"[bold red]❌ {message}[/bold red]")
     else:
         print(f"ERROR: {message}")
 
 def print_warning(message):
     """Print warning message with nice formatting if Rich is available"""
     if HAS_RICH:
-        console.print(f"[yellow]⚠️ {message}[/yellow]")
+        get_console().print(f"[yellow]⚠️ {message}[/yellow]")
     else:
         print(f"WARNING: {message}")
 
-def run_command(command, capture_output=False, shell=False):
+@functools.lru_cache(maxsize=None)
+def path_exists(path):
+    """Check a path once per run - compose and env files don't change mid-command"""
+    return os.path.exists(path)
+
+@functools.lru_cache(maxsize=None)
+def has_tool(name):
+    """Return whether an executable is on PATH, checking each name only once"""
+    return shutil.which(name) is not None
+
+def compose_base(env, env_file_envs=("prod",)):
+    """Return the `docker compose` command prefix for an environment
+    
+    The env file is only passed for environments listed in env_file_envs, and only
+    if it exists. For dev, any sampling overrides written by `sampling-rate` are
+    layered on top.
+    """
+    env_file = ENV_FILES[env]
+    base_cmd = ["docker", "compose"]
+    if env in env_file_envs and path_exists(env_file):
+        base_cmd.extend(["--env-file", env_file])
+    base_cmd.extend(["-f", str(COMPOSE_FILES[env])])
+    if env == "dev":
+        # Not path_exists: sampling-rate writes these files during the run
+        for override_file in SAMPLING_OVERRIDE_FILES.values():
+            if override_file.exists():
+                base_cmd.extend(["-f", str(override_file)])
+    return base_cmd
+
+def run_command(command, capture_output=False, shell=False, env=None):
     """Run a shell command with proper error handling"""
     try:
         if capture_output:
-            result = subprocess.run(command, check=True, capture_output=True, text=True, shell=shell)
+            result = subprocess.run(command, check=True, capture_output=True, text=True, shell=shell, env=env)
             return result.stdout
         else:
-            subprocess.run(command, check=True, shell=shell)
+            subprocess.run(command, check=True, shell=shell, env=env)
             return True
     except subprocess.CalledProcessError as e:
         print_error(f"Error executing command: {command if isinstance(command, str) else ' '.join(command)}")
         print_error(f"{e}")
         return False
 
-def build_services(env="dev", services=None):
+def build_services(env="dev", services=None, jobs=None):
     """Build Docker services"""
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
+    compose_file = COMPOSE_FILES[env]
+    env_file = ENV_FILES[env]
     
-    # Determine which env file to use
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
+    # Compose v2 builds services in parallel through BuildKit; make sure BuildKit is on
+    # and optionally cap how many services build at once so large stacks don't
+    # oversubscribe the host
+    build_env = {**os.environ, "DOCKER_BUILDKIT": "1", "COMPOSE_DOCKER_CLI_BUILD": "1"}
+    if jobs:
+        build_env["COMPOSE_PARALLEL_LIMIT"] = str(jobs)
     
     print_info(f"Building services with {compose_file}...")
     
-    if os.path.exists(env_file):
-        # Safely build command as a list instead of using shell=True with string
-        build_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "build", "--no-cache"]
-        if services:
-            build_cmd.extend(services)
-        
-        if HAS_RICH:
-            with Progress() as progress:
-                task = progress.add_task("[green]Building...", total=1)
-                success = run_command(build_cmd)
-                progress.update(task, advance=1)
-        else:
-            success = run_command(build_cmd)
+    if not path_exists(env_file) and env == "prod":
+        print_warning(f"No {env_file} found. Using default values (not secure for production).")
+    
+    build_cmd = compose_base(env, env_file_envs=("dev", "prod")) + ["build", "--no-cache"]
+    if services:
+        build_cmd.extend(services)
+    
+    if HAS_RICH:
+        from rich.progress import Progress
+        with Progress() as progress:
+            task = progress.add_task("[green]Building...", total=1)
+            success = run_command(build_cmd, env=build_env)
+            progress.update(task, advance=1)
     else:
-        if env == "prod":
-            print_warning(f"No {env_file} found. Using default values (not secure for production).")
-        
-        build_cmd = ["docker", "compose", "-f", str(compose_file), "build", "--no-cache"]
-        if services:
-            build_cmd.extend(services)
-        
-        if HAS_RICH:
-            with Progress() as progress:
-                task = progress.add_task("[green]Building...", total=1)
-                success = run_command(build_cmd)
-                progress.update(task, advance=1)
-        else:
-            success = run_command(build_cmd)
+        success = run_command(build_cmd, env=build_env)
     
     if success:
         print_success("Build completed successfully!")
@@ -127,15 +284,15 @@ def start_services(env, services=None):
         sys.exit(1)
     
     # Set file paths based on environment
-    compose_file = COMPOSE_PROD if env == "prod" else COMPOSE_DEV
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
+    compose_file = COMPOSE_FILES[env]
+    env_file = ENV_FILES[env]
     
     # Check for required files
-    if not os.path.exists(compose_file):
+    if not path_exists(compose_file):
         print_error(f"Missing compose file: {compose_file}")
         sys.exit(1)
     
-    if not os.path.exists(env_file):
+    if not path_exists(env_file):
         print_error(f"Missing environment file: {env_file}")
         sys.exit(1)
     
@@ -143,7 +300,7 @@ def start_services(env, services=None):
     print_info(f"Starting services with {compose_file}...")
     
     # Build and run command
-    start_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "up", "-d"]
+    start_cmd = compose_base(env, env_file_envs=("dev", "prod")) + ["up", "-d"]
     if services:
         start_cmd.extend(services)
     
@@ -153,21 +310,14 @@ def start_services(env, services=None):
         sys.exit(1)
     
     return success
+
+def stop_services(env="dev"):
     """Stop Docker services"""
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
-    
-    # Determine which env file to use for consistency
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
+    compose_file = COMPOSE_FILES[env]
     
     print_info(f"Stopping services with {compose_file}...")
     
-    if os.path.exists(env_file) and env == "prod":
-        # Safely build command as a list instead of using shell=True with string
-        stop_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "down"]
-        success = run_command(stop_cmd)
-    else:
-        stop_cmd = ["docker", "compose", "-f", str(compose_file), "down"]
-        success = run_command(stop_cmd)
+    success = run_command(compose_base(env) + ["down"])
     
     if success:
         print_success("Services stopped successfully!")
@@ -175,48 +325,86 @@ def start_services(env, services=None):
         print_error("Failed to stop services!")
         sys.exit(1)
 
+def run_migrations(env="dev"):
+    """Apply the SQL migrations to the running database, in file name order
+    
+    The init scripts only run against an empty data volume, so existing databases
+    pick up schema changes from here. Each migration is idempotent and stops
+    with psql's error if the data needs fixing first.
+    """
+    migrations = sorted(MIGRATIONS_DIR.glob("*.sql"))
+    if not migrations:
+        print_info("No migrations to apply.")
+        return
+    
+    psql_cmd = compose_base(env) + [
+        "exec", "-T", "db", "sh", "-c",
+        'psql -v ON_ERROR_STOP=1 -U "$POSTGRES_USER" -d "$POSTGRES_DB"',
+    ]
+    for migration in migrations:
+        print_info(f"Applying {migration.name}...")
+        with open(migration, "rb") as sql:
+            result = subprocess.run(psql_cmd, stdin=sql)
+        if result.returncode != 0:
+            print_error(f"Migration {migration.name} failed; nothing from it was applied.")
+            sys.exit(1)
+    
+    print_success("Migrations applied successfully!")
+
 def check_services_health(env="dev"):
     """Check the health status of all services"""
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
-    
     print_info("Checking service health...")
     
-    # Build command based on whether env file exists
-    if os.path.exists(env_file) and env == "prod":
-        ps_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "ps", "--format", "json"]
-    else:
-        ps_cmd = ["docker", "compose", "-f", str(compose_file), "ps", "--format", "json"]
+    ps_cmd = compose_base(env) + ["ps", "--format", "json"]
     
-    # Get running containers
-    containers = run_command(ps_cmd, capture_output=True)
+    # Get running containers, decoding each ndjson line as docker emits it
+    # instead of buffering the whole output first
+    container_list = []
+    raw_lines = []
+    parse_failed = False
+    proc = None
+    try:
+        with subprocess.Popen(ps_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True, bufsize=1) as proc:
+            for line in proc.stdout:
+                raw_lines.append(line)
+                if parse_failed or not line.strip():
+                    continue
+                try:
+                    parsed = json_loads(line)
+                except json.JSONDecodeError:
+                    parse_failed = True
+                    continue
+                # Compose releases before 2.21 print a single JSON array instead
+                if isinstance(parsed, list):
+                    container_list.extend(parsed)
+                else:
+                    container_list.append(parsed)
+    except OSError as e:
+        print_error(f"Error executing command: {' '.join(ps_cmd)}")
+        print_error(f"{e}")
+        proc = None
     
-    if not containers:
+    if proc is None or proc.returncode != 0 or not "".join(raw_lines).strip():
+        if proc is not None and proc.returncode != 0:
+            print_error(f"Error executing command: {' '.join(ps_cmd)}")
         print_warning("No running containers found.")
         return
     
-    # Parse container information
-    try:
-        container_list = []
-        for line in containers.strip().split('\n'):
-            if line:
-                container_list.append(json.loads(line))
-    except json.JSONDecodeError:
-        # Fallback to older format if json format is not available
-        if os.path.exists(env_file) and env == "prod":
-            ps_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "ps"]
-        else:
-            ps_cmd = ["docker", "compose", "-f", str(compose_file), "ps"]
-            
-        containers = run_command(ps_cmd, capture_output=True)
-        if not containers:
-            print_warning("No running containers found.")
+    if parse_failed:
+        # Output may be a single JSON document spread over several lines; retry the
+        # text we already have as a whole before giving up on structured parsing
+        containers = "".join(raw_lines).strip()
+        try:
+            parsed = json_loads(containers)
+            container_list = parsed if isinstance(parsed, list) else [parsed]
+        except json.JSONDecodeError:
+            # Not JSON at all (json format unsupported) - show the raw listing
+            print_info(containers)
             return
-        print_info(containers)
-        return
     
     if HAS_RICH:
-        table = Table(title="Service Health Status")
+        table = make_table(title="Service Health Status")
         table.add_column("Service", style="cyan")
         table.add_column("Status", style="magenta")
         table.add_column("Health", style="green")
@@ -239,7 +427,7 @@ def check_services_health(env="dev"):
             
             table.add_row(name, status, health_display)
         
-        console.print(table)
+        get_console().print(table)
     else:
         for container in container_list:
             name = container.get('Name', 'Unknown')
@@ -249,22 +437,22 @@ def check_services_health(env="dev"):
     
     # Also try to check API health endpoint if available
     try:
-        result = subprocess.run(
-            ["curl", "-s", "http://localhost:8000/health"], 
-            capture_output=True, 
-            text=True, 
-            check=False
-        )
-        if result.returncode == 0:
-            print_info("API Health Check:")
-            try:
-                api_health = json.loads(result.stdout)
-                for key, value in api_health.items():
-                    print(f"  {key}: {value}")
-            except json.JSONDecodeError:
-                print_info(result.stdout)
-    except Exception as e:
-        print_warning(f"API health endpoint not reachable yet: {e}")
+        with urlopen(API_HEALTH_URL, timeout=2) as response:
+            body = response.read()
+    except HTTPError as e:
+        # Error responses still carry the health payload
+        body = e.read()
+    except (URLError, OSError):
+        body = None
+    
+    if body is not None:
+        print_info("API Health Check:")
+        try:
+            api_health = json_loads(body)
+            for key, value in api_health.items():
+                print(f"  {key}: {value}")
+        except (json.JSONDecodeError, AttributeError):
+            print_info(body.decode(errors="replace"))
 
 def scan_images(services=None):
     """Scan Docker images for vulnerabilities"""
@@ -296,22 +484,38 @@ def scan_images(services=None):
         return
     
     images = images_output.strip().split('\n')
-    project_images = [img for img in images if not img.startswith('prom/') 
-                     and not img.startswith('grafana/') 
-                     and not img.startswith('redis:') 
-                     and not img.startswith('postgres:')
-                     and not img.endswith('<none>')]
+    project_images = [img for img in images
+                      if not img.startswith(SCAN_SKIP_PREFIXES) and not img.endswith('<none>')]
     
     if services:
         # Filter images by service name
         project_images = [img for img in project_images if any(service in img for service in services)]
     
+    if not project_images:
+        print_warning("No project images found to scan.")
+        return
+    
+    # Quickview is read-only, so scan every image at once and only keep the
+    # interactive drill-down sequential
+    print_info(f"Scanning {len(project_images)} images...")
+    
+    def quickview(image):
+        scan_cmd = ["docker", "scout", "quickview", image]
+        return subprocess.run(scan_cmd, capture_output=True, text=True, check=False)
+    
+    with ThreadPoolExecutor(max_workers=min(8, len(project_images))) as executor:
+        quickviews = dict(zip(project_images, executor.map(quickview, project_images)))
+    
     for image in project_images:
         print_info(f"Scanning image: {image}")
         
-        # Run Docker Scout scan
-        scan_cmd = ["docker", "scout", "quickview", image]
-        run_command(scan_cmd)
+        # Show the Docker Scout scan collected above
+        result = quickviews[image]
+        if result.returncode == 0:
+            print(result.stdout)
+        else:
+            print_error(f"Error executing command: docker scout quickview {image}")
+            print_error(result.stderr.strip())
         
         # Ask if detailed scan is wanted
         answer = input("\nRun detailed scan? [y/N]: ")
@@ -327,11 +531,6 @@ def scan_images(services=None):
 
 def run_tests(env="dev", test_path=None):
     """Run automated tests"""
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
-    
-    # Determine which env file to use for consistency
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
-    
     print_info("Running automated tests...")
     
     if not test_path:
@@ -354,48 +553,30 @@ def run_tests(env="dev", test_path=None):
         
         if service_name == "api":
             # Run Python tests
-            if os.path.exists(env_file) and env == "prod":
-                test_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "exec", "api", "pytest", "-xvs", test_dir]
-            else:
-                test_cmd = ["docker", "compose", "-f", str(compose_file), "exec", "api", "pytest", "-xvs", test_dir]
+            test_cmd = compose_base(env) + ["exec", "api", "pytest", "-xvs", test_dir]
             
             run_command(test_cmd)
         elif service_name == "frontend":
             # Run JavaScript tests
-            if os.path.exists(env_file) and env == "prod":
-                test_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "exec", "frontend", "npm", "test", "--", "--watchAll=false"]
-            else:
-                test_cmd = ["docker", "compose", "-f", str(compose_file), "exec", "frontend", "npm", "test", "--", "--watchAll=false"]
+            test_cmd = compose_base(env) + ["exec", "frontend", "npm", "test", "--", "--watchAll=false"]
             
             run_command(test_cmd)
 
 def show_logs(env="dev", service=None, tail=100):
     """Show logs for services"""
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
-    
-    # Determine which env file to use for consistency
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
+    log_cmd = compose_base(env) + ["logs", "--tail", str(tail), "-f"]
     
     if service:
         print_info(f"Showing logs for {service}...")
-        if os.path.exists(env_file) and env == "prod":
-            log_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "logs", "--tail", str(tail), "-f", service]
-        else:
-            log_cmd = ["docker", "compose", "-f", str(compose_file), "logs", "--tail", str(tail), "-f", service]
-        
-        run_command(log_cmd)
+        log_cmd.append(service)
     else:
         print_info("Showing logs for all services...")
-        if os.path.exists(env_file) and env == "prod":
-            log_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "logs", "--tail", str(tail), "-f"]
-        else:
-            log_cmd = ["docker", "compose", "-f", str(compose_file), "logs", "--tail", str(tail), "-f"]
-        
-        run_command(log_cmd)
+    
+    run_command(log_cmd)
 
 def start_monitoring():
     """Start the monitoring stack"""
-    if not COMPOSE_MONITORING.exists():
+    if not path_exists(COMPOSE_MONITORING):
         print_error(f"Monitoring compose file not found at {COMPOSE_MONITORING}")
         print_info("Run the setup-monitoring script first.")
         return
@@ -410,7 +591,7 @@ def start_monitoring():
 
 def stop_monitoring():
     """Stop the monitoring stack"""
-    if not COMPOSE_MONITORING.exists():
+    if not path_exists(COMPOSE_MONITORING):
         print_error(f"Monitoring compose file not found at {COMPOSE_MONITORING}")
         return
     
@@ -443,6 +624,33 @@ def show_container_stats():
     except Exception as e:
         print_error(f"Error displaying stats: {e}")
 
+def open_file(path):
+    """Open a file in the platform's default viewer without waiting for it"""
+    try:
+        if sys.platform == 'win32':  # Windows
+            os.startfile(path)
+        elif sys.platform == 'darwin':  # macOS
+            subprocess.Popen(['open', path], start_new_session=True)
+        elif sys.platform.startswith('linux'):
+            subprocess.Popen(['xdg-open', path], start_new_session=True)
+    except OSError as e:
+        print_warning(f"Couldn't open {path}: {e}")
+
+@functools.lru_cache(maxsize=4)
+def load_compose_file(path, mtime_ns):
+    """Parse a compose file, cached per modification time
+    
+    Uses libyaml's C loader when PyYAML was built with it.
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
 def generate_dependency_graph():
     """Generate a dependency graph of the Docker services"""
     print_info("Generating service dependency graph...")
@@ -457,63 +665,60 @@ def generate_dependency_graph():
     
     # Read the compose files to extract dependencies
     try:
-        import yaml
-        
         # Try to read compose files
-        dev_services = {}
-        prod_services = {}
-        
-        if COMPOSE_DEV.exists():
-            with open(COMPOSE_DEV, 'r') as f:
-                dev_compose = yaml.safe_load(f)
-                if dev_compose and 'services' in dev_compose:
-                    dev_services = dev_compose['services']
+        all_services = {}
+        for compose_file in (COMPOSE_DEV, COMPOSE_PROD):
+            if path_exists(compose_file):
+                compose = load_compose_file(compose_file, compose_file.stat().st_mtime_ns)
+                if compose and 'services' in compose:
+                    all_services.update(compose['services'])
         
-        if COMPOSE_PROD.exists():
-            with open(COMPOSE_PROD, 'r') as f:
-                prod_compose = yaml.safe_load(f)
-                if prod_compose and 'services' in prod_compose:
-                    prod_services = prod_compose['services']
-        
-        if not dev_services and not prod_services:
+        if not all_services:
             print_error("No services found in compose files.")
             return
         
-        # Create a digraph for the dependencies
-        dot = graphviz.Digraph(comment='Service Dependencies')
+        # Collect dependencies as edges
+        dependency_map = {}
+        for service, config in all_services.items():
+            dependencies = config.get('depends_on') or []
+            # Extended dependency syntax is a dict keyed by service, with conditions
+            dependency_map[service] = list(dependencies.keys() if isinstance(dependencies, dict) else dependencies)
+        
+        # Create a digraph for the dependencies; sfdp's multilevel layout scales
+        # better than dot once the graph gets large
+        engine = 'sfdp' if len(all_services) > LARGE_GRAPH_NODES else 'dot'
+        dot = graphviz.Digraph(comment='Service Dependencies', engine=engine)
         
         # Add services as nodes
-        all_services = set(list(dev_services.keys()) + list(prod_services.keys()))
         for service in all_services:
-            dot.node(service, service)
+            dot.node(service)
         
-        # Add dependencies as edges
-        for service, config in {**dev_services, **prod_services}.items():
-            if 'depends_on' in config:
-                dependencies = config['depends_on']
-                if isinstance(dependencies, list):
-                    # Simple dependency list
-                    for dependency in dependencies:
-                        dot.edge(service, dependency)
-                elif isinstance(dependencies, dict):
-                    # Extended dependency syntax with conditions
-                    for dependency in dependencies.keys():
-                        dot.edge(service, dependency)
+        for service, dependencies in dependency_map.items():
+            for dependency in dependencies:
+                dot.edge(service, dependency)
         
-        # Render the graph
-        try:
-            dot.render('service_dependencies', format='png', cleanup=True)
-            print_success("Dependency graph generated as 'service_dependencies.png'")
-            # Try to open the image
-            if sys.platform == 'darwin':  # macOS
-                run_command(['open', 'service_dependencies.png'], shell=False)
-            elif sys.platform.startswith('linux'):
-                run_command(['xdg-open', 'service_dependencies.png'], shell=False)
-            elif sys.platform == 'win32':  # Windows
-                run_command(['start', 'service_dependencies.png'], shell=True)
-        except Exception as e:
-            print_error(f"Error rendering graph: {e}")
-            print_info("Raw graph data is available in 'service_dependencies' file.")
+        # Render the graph in the background while the text summary is printed
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            render = executor.submit(dot.render, 'service_dependencies', format='png', cleanup=True)
+            
+            if HAS_RICH:
+                table = make_table(title="Service Dependencies")
+                table.add_column("Service", style="cyan")
+                table.add_column("Depends On", style="green")
+                for service, dependencies in dependency_map.items():
+                    table.add_row(service, ", ".join(dependencies) or "-")
+                get_console().print(table)
+            else:
+                for service, dependencies in dependency_map.items():
+                    print(f"{service} -> {', '.join(dependencies) or '-'}")
+            
+            try:
+                render.result()
+                print_success("Dependency graph generated as 'service_dependencies.png'")
+                # Try to open the image
+                open_file('service_dependencies.png')
+            except Exception as e:
+                print_error(f"Error rendering graph: {e}")
         
     except ImportError:
         print_error("PyYAML package not found. Install with: pip install pyyaml")
@@ -543,64 +748,132 @@ def network_check():
         return
         
     if HAS_RICH:
-        table = Table(title="Network Connectivity Test")
+        table = make_table(title="Network Connectivity Test")
         table.add_column("Source", style="cyan")
         table.add_column("Target", style="cyan")
         table.add_column("Status", style="green")
         table.add_column("Latency", style="magenta")
     
-    # Test connectivity between each pair of service containers
+    # Build every (source, target) pair up front so the pings can run concurrently
+    pairs = []
     for source in filtered_containers:
         # Extract service name for cleaner display
         source_name = source.replace("docker-microservices-project-", "").replace("-1", "")
-        
         for target in filtered_containers:
             if source != target:
-                # Extract service name for cleaner display
                 target_name = target.replace("docker-microservices-project-", "").replace("-1", "")
-                
-                # Use ping to test connectivity
-                ping_cmd = ["docker", "exec", source, "ping", "-c", "1", "-W", "1", target_name]
-                result = subprocess.run(ping_cmd, capture_output=True, text=True, check=False)
-                
-                status = "✅ Connected" if result.returncode == 0 else "❌ Failed"
-                
-                # Extract latency if connected
-                latency = "N/A"
-                if result.returncode == 0:
-                    import re
-                    match = re.search(r"time=(\d+\.\d+) ms", result.stdout)
-                    if match:
-                        latency = f"{match.group(1)} ms"
-                
-                if HAS_RICH:
-                    table.add_row(source_name, target_name, status, latency)
-                else:
-                    print(f"Source: {source_name}, Target: {target_name}, Status: {status}, Latency: {latency}")
+                pairs.append((source, source_name, target_name))
+    
+    def ping(pair):
+        source, _, target_name = pair
+        # Use ping to test connectivity
+        ping_cmd = ["docker", "exec", source, "ping", "-c", "1", "-W", "1", target_name]
+        return subprocess.run(ping_cmd, capture_output=True, text=True, check=False)
+    
+    if pairs:
+        with ThreadPoolExecutor(max_workers=min(32, len(pairs))) as executor:
+            results = list(executor.map(ping, pairs))
+    else:
+        results = []
+    
+    # Render once all pings are back, in the original pair order
+    for (_, source_name, target_name), result in zip(pairs, results):
+        status = "✅ Connected" if result.returncode == 0 else "❌ Failed"
+        
+        # Extract latency if connected
+        latency = "N/A"
+        if result.returncode == 0:
+            match = PING_LATENCY_RE.search(result.stdout)
+            if match:
+                latency = f"{match.group(1)} ms"
+        
+        if HAS_RICH:
+            table.add_row(source_name, target_name, status, latency)
+        else:
+            print(f"Source: {source_name}, Target: {target_name}, Status: {status}, Latency: {latency}")
     
     if HAS_RICH:
-        console.print(table)
+        get_console().print(table)
+        
+def wait_for_healthy(env, service, timeout=30):
+    """Poll a service until all its containers are running and healthy
+    
+    Backs off exponentially from 0.1s up to 1s between polls. Containers without a
+    health check count as ready once running. Returns False on timeout.
+    """
+    ps_cmd = compose_base(env) + ["ps", "--format", "json", service]
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    
+    while True:
+        result = subprocess.run(ps_cmd, capture_output=True, text=True, check=False)
+        containers = []
+        if result.returncode == 0:
+            for line in result.stdout.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    parsed = json_loads(line)
+                except json.JSONDecodeError:
+                    continue
+                containers.extend(parsed if isinstance(parsed, list) else [parsed])
         
+        if containers and all(
+            c.get('State') == 'running' and c.get('Health', '') in ('', 'healthy')
+            for c in containers
+        ):
+            return True
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(0.1 * 2 ** attempt, 1.0, remaining))
+        attempt += 1
+
+def wait_for_api(timeout=30):
+    """Poll the API health endpoint until it answers, backing off like wait_for_healthy"""
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    
+    while True:
+        try:
+            with urlopen(API_HEALTH_URL, timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except (HTTPError, URLError, OSError):
+            pass
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(0.1 * 2 ** attempt, 1.0, remaining))
+        attempt += 1
+
+def set_api_tracing(enabled):
+    """Recreate the dev API container with tracing switched on or off
+    
+    ENABLE_TRACING is only read when the API starts, so the container has to be
+    recreated with the new value; returns once the API answers again.
+    """
+    env = dict(os.environ, ENABLE_TRACING="true" if enabled else "false")
+    if not run_command(compose_base("dev") + ["up", "-d", "--no-deps", "api"], env=env):
+        return False
+    return wait_for_api()
+
 def restart_service(env="dev", service=None):
     """Restart a specific service"""
     if not service:
         print_error("Please specify a service to restart with --service")
         return
-        
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
     
     print_info(f"Restarting service: {service}...")
     
-    # Build restart command
-    if os.path.exists(env_file) and env == "prod":
-        restart_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "restart", service]
-    else:
-        restart_cmd = ["docker", "compose", "-f", str(compose_file), "restart", service]
+    restart_cmd = compose_base(env) + ["restart", service]
     
     if run_command(restart_cmd):
         print_success(f"Service {service} restarted successfully!")
-        time.sleep(3)  # Wait a bit for the service to be ready
+        if not wait_for_healthy(env, service):
+            print_warning(f"Service {service} is not healthy yet")
         check_services_health(env)
     else:
         print_error(f"Failed to restart service {service}")
@@ -611,9 +884,6 @@ def scale_service(env="dev", service=None, replicas=1):
         print_error("Please specify a service to scale with --service")
         return
     
-    compose_file = COMPOSE_DEV if env == "dev" else COMPOSE_PROD
-    env_file = ".env.prod" if env == "prod" else ".env.dev"
-    
     # Check if the service is scalable
     non_scalable = ['db', 'redis', 'postgres', 'mysql', 'mongodb']
     if any(name in service.lower() for name in non_scalable):
@@ -625,15 +895,12 @@ def scale_service(env="dev", service=None, replicas=1):
     
     print_info(f"Scaling service {service} to {replicas} replicas...")
     
-    # Build scale command
-    if os.path.exists(env_file) and env == "prod":
-        scale_cmd = ["docker", "compose", "--env-file", env_file, "-f", str(compose_file), "up", "-d", "--scale", f"{service}={replicas}"]
-    else:
-        scale_cmd = ["docker", "compose", "-f", str(compose_file), "up", "-d", "--scale", f"{service}={replicas}"]
+    scale_cmd = compose_base(env) + ["up", "-d", "--scale", f"{service}={replicas}"]
     
     if run_command(scale_cmd):
         print_success(f"Service {service} scaled to {replicas} replicas!")
-        time.sleep(3)  # Wait a bit for the services to be ready
+        if not wait_for_healthy(env, service):
+            print_warning(f"Service {service} is not healthy yet")
         check_services_health(env)
     else:
         print_error(f"Failed to scale service {service}")
@@ -645,28 +912,50 @@ def security_check():
     # List of checks to perform
     security_issues = []
     
+    # Inspect every running container in one daemon call and run the
+    # per-container checks against that JSON. If the containers can't be listed
+    # or inspected, stop rather than report a pass for checks that never ran
+    container_ids = run_command(["docker", "ps", "-q"], capture_output=True)
+    if container_ids is False:
+        print_error("Couldn't list running containers; security check not completed.")
+        return
+    
+    inspected = []
+    container_ids = container_ids.split()
+    if container_ids:
+        inspect_output = run_command(["docker", "inspect", *container_ids], capture_output=True)
+        if inspect_output is False:
+            print_error("Couldn't inspect running containers; security check not completed.")
+            return
+        try:
+            inspected = json_loads(inspect_output)
+        except json.JSONDecodeError:
+            print_error("Couldn't parse docker inspect output; security check not completed.")
+            return
+    
     # 1. Check for containers running as root
     print_info("Checking for containers running as root...")
-    containers = run_command(["docker", "ps", "--format", "{{.Names}}"], capture_output=True)
-    
-    if containers:
-        for container in containers.strip().split('\n'):
-            user_cmd = ["docker", "exec", container, "whoami"]
-            result = subprocess.run(user_cmd, capture_output=True, text=True, check=False)
-            if result.returncode == 0 and result.stdout.strip() == "root":
-                security_issues.append(f"Container {container} is running as root user")
+    for container in inspected:
+        name = container.get("Name", "").lstrip("/")
+        # No configured user means the image default, which is root
+        user = (container.get("Config") or {}).get("User") or "root"
+        if user.split(":")[0] in ("root", "0"):
+            security_issues.append(f"Container {name} is running as root user")
     
     # 2. Check for exposed ports that should be internal
     print_info("Checking for unnecessarily exposed ports...")
-    port_cmd = ["docker", "ps", "--format", "{{.Names}}: {{.Ports}}"]
-    ports = run_command(port_cmd, capture_output=True)
-    
     sensitive_ports = ['5432', '6379', '27017', '3306']  # Database ports
-    if ports:
-        for line in ports.strip().split('\n'):
-            for port in sensitive_ports:
-                if f":{port}->" in line:
-                    security_issues.append(f"Sensitive port {port} is publicly exposed in {line.split(':')[0]}")
+    for container in inspected:
+        name = container.get("Name", "").lstrip("/")
+        port_bindings = (container.get("NetworkSettings") or {}).get("Ports") or {}
+        host_ports = {
+            binding.get("HostPort")
+            for bindings in port_bindings.values() if bindings
+            for binding in bindings
+        }
+        for port in sensitive_ports:
+            if port in host_ports:
+                security_issues.append(f"Sensitive port {port} is publicly exposed in {name}")
     
     # 3. Check Docker version for known vulnerabilities
     print_info("Checking Docker version...")
@@ -677,21 +966,15 @@ def security_check():
     
     # 4. Check for containers with privileged mode
     print_info("Checking for privileged containers...")
-    inspect_cmd = ["docker", "ps", "-q"]
-    container_ids = run_command(inspect_cmd, capture_output=True)
-    
-    if container_ids:
-        for cid in container_ids.strip().split('\n'):
-            if cid:
-                priv_cmd = ["docker", "inspect", "--format", "{{.Name}}: {{.HostConfig.Privileged}}", cid]
-                priv_status = run_command(priv_cmd, capture_output=True)
-                if priv_status and "true" in priv_status.lower():
-                    security_issues.append(f"Container {priv_status.split(':')[0]} is running in privileged mode")
+    for container in inspected:
+        if (container.get("HostConfig") or {}).get("Privileged"):
+            name = container.get("Name", "").lstrip("/")
+            security_issues.append(f"Container {name} is running in privileged mode")
     
     # Display security issues in a table if Rich is available
     if HAS_RICH:
         if security_issues:
-            table = Table(title="Security Issues Found")
+            table = make_table(title="Security Issues Found")
             table.add_column("Issue", style="red")
             table.add_column("Recommendation", style="green")
             
@@ -708,9 +991,9 @@ def security_check():
                 
                 table.add_row(issue, recommendation)
             
-            console.print(table)
+            get_console().print(table)
         else:
-            console.print("[green]✅ No security issues found![/green]")
+            get_console().print("[green]✅ No security issues found![/green]")
     else:
         if security_issues:
             print("Security issues found:")
@@ -724,7 +1007,7 @@ def start_tracing():
     print_info("Starting Jaeger tracing system...")
     
     # Check if compose file exists
-    if not COMPOSE_TRACING.exists():
+    if not path_exists(COMPOSE_TRACING):
         print_error("Tracing compose file not found.")
         return
     
@@ -732,18 +1015,54 @@ def start_tracing():
     print_success("Jaeger UI available at: http://localhost:16686")
     print_info("Note: You won't see any traces until services are instrumented.")
 
+def start_all(env):
+    """Start the application, monitoring and tracing stacks together
+    
+    Monitoring and tracing attach to networks created by the application stack, so
+    that comes up first; the two observability stacks are independent of each
+    other and start concurrently.
+    """
+    start_services(env)
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(start_monitoring), executor.submit(start_tracing)]
+        for future in futures:
+            future.result()
+
 def stop_tracing():
     """Stop the distributed tracing system"""
     print_info("Stopping Jaeger tracing system...")
     
     # Check if compose file exists
-    if not COMPOSE_TRACING.exists():
+    if not path_exists(COMPOSE_TRACING):
         print_error("Tracing compose file not found.")
         return
     
     run_command(["docker", "compose", "-f", str(COMPOSE_TRACING), "down"])
     print_success("Tracing system stopped!")
 
+@functools.lru_cache(maxsize=1)
+def _jaeger_services(time_bucket):
+    """Probe Jaeger once per time bucket; see jaeger_services"""
+    try:
+        response = get_http_session().get(f"{JAEGER_URL}/api/services", timeout=5)
+    except Exception:
+        return None
+    if response.status_code != 200:
+        return None
+    try:
+        return tuple(response.json().get("data") or ())
+    except ValueError:
+        return ()
+
+def jaeger_services():
+    """Return the services known to Jaeger, or None if Jaeger isn't reachable
+    
+    The probe result is reused for JAEGER_PROBE_TTL seconds so commands that
+    check Jaeger more than once only pay for it the first time.
+    """
+    return _jaeger_services(int(time.time() // JAEGER_PROBE_TTL))
+
 def check_tracing_status():
     """Check the status of the tracing system"""
     print_info("Checking Jaeger tracing system status...")
@@ -756,8 +1075,7 @@ def check_tracing_status():
         
         # Try to connect to Jaeger UI
         try:
-            import urllib.request
-            code = urllib.request.urlopen("http://localhost:16686").getcode()
+            code = get_http_session().get(JAEGER_URL, timeout=5).status_code
             if code == 200:
                 print_success("✅ Jaeger UI is accessible at: http://localhost:16686")
             else:
@@ -771,162 +1089,125 @@ def query_traces(service=None, operation=None, tags=None, limit=20):
     """Query traces from Jaeger and display results"""
     print_info("Querying traces from Jaeger...")
     
-    # First check if Jaeger is running
-    jaeger_check = run_command(
-        ["curl", "-s", "-o", "/dev/null", "-w", "%{http_code}", "http://localhost:16686/api/services"],
-        capture_output=True
-    )
-    if not jaeger_check or jaeger_check.strip() != "200":
-        print_error("Jaeger is not running. Start it with: ./microservices start-tracing")
-        return
+    session = get_http_session()
     
-    # Build query URL
-    query_params = []
+    # Build query URL; a dict keeps each parameter to a single occurrence
+    query_params = {}
     if service:
-        query_params.append(f"service={service}")
+        query_params["service"] = service
     if operation:
-        query_params.append(f"operation={operation}")
+        query_params["operation"] = operation
     if tags:
-        # Format tags as JSON: {"key":"value"}
-        for key, value in tags.items():
-            query_params.append(f'tags=%7B%22{key}%22%3A%22{value}%22%7D')
-    
-    query_params.append(f"limit={limit}")
+        # Jaeger takes tag filters as one JSON object: {"key":"value",...}
+        query_params["tags"] = json.dumps(tags, separators=(",", ":"))
     
-    # If no parameters were provided, try to get all traces
-    if not service and not operation and not tags:
-        # Add a generous lookback period and limit
-        lookback = int(time.time() * 1000000) - (24 * 3600 * 1000000)  # 24 hours in microseconds
-        query_params.append(f"start={lookback}")
-        query_params.append("limit=1000")  # Get more traces
+    if service or operation or tags:
+        query_params["limit"] = limit
+    else:
+        # No filters - look back over a generous period and get more traces
+        lookback = time.time_ns() // 1000 - 24 * 3600 * 1_000_000  # 24 hours in microseconds
+        query_params["start"] = lookback
+        query_params["limit"] = 1000
     
-    query_url = f"http://localhost:16686/api/traces?{'&'.join(query_params)}"
+    query_url = f"{JAEGER_URL}/api/traces?{urlencode(query_params)}"
     print_info(f"Querying Jaeger: {query_url}")
     
+    # Check that Jaeger is running and fetch traces at the same time; the service
+    # list also feeds the diagnostic when nothing matches
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        services_future = executor.submit(jaeger_services)
+        traces_future = executor.submit(session.get, query_url, timeout=30, stream=True)
+    
+    services_data = services_future.result()
+    if services_data is None:
+        print_error("Jaeger is not running. Start it with: ./microservices start-tracing")
+        return
+    
     # Fetch traces
     try:
-        result = subprocess.run(["curl", "-s", query_url], capture_output=True, text=True)
-        if result.returncode != 0:
-            print_error(f"Failed to query traces: {result.stderr}")
+        try:
+            response = traces_future.result()
+        except Exception as e:
+            print_error(f"Failed to query traces: {e}")
             return
         
-        # Parse JSON response
+        # Parse the response as it streams in, one trace at a time
         try:
-            traces = json.loads(result.stdout)
-            
-            if not traces.get("data") or len(traces["data"]) == 0:
-                print_warning("No traces found matching the criteria.")
-                
-                # If no traces were found but Jaeger is running, try to diagnose
-                services_resp = subprocess.run(
-                    ["curl", "-s", "http://localhost:16686/api/services"],
-                    capture_output=True, text=True
-                )
-                try:
-                    services_data = json.loads(services_resp.stdout)
-                    if len(services_data) <= 1 and "jaeger-query" in services_data:
-                        print_info("No services are reporting traces to Jaeger.")
-                        print_info("Check that your applications are properly instrumented and running.")
-                        print_info("Remember to generate some traffic to create traces.")
-                    else:
-                        print_info(f"Available services: {', '.join(services_data)}")
-                        print_info("Try querying traces for a specific service.")
-                except:
-                    pass
-                return
-            
-            # Display results in a table
+            trace_count = 0
             if HAS_RICH:
-                table = Table(title=f"Traces ({len(traces['data'])} results)")
+                table = make_table()
                 table.add_column("Trace ID", style="cyan")
                 table.add_column("Duration (ms)", style="magenta")
                 table.add_column("Services", style="green")
                 table.add_column("Operations", style="yellow")
                 table.add_column("Start Time", style="blue")
-                
-                for trace in traces["data"]:
-                    trace_id = trace.get("traceID", "Unknown")
-                    
-                    # Calculate duration in ms
-                    duration_ms = 0
-                    start_time = None
-                    services = set()
-                    operations = set()
-                    
-                    for span in trace.get("spans", []):
-                        duration_ms = max(duration_ms, span.get("duration", 0) / 1000)  # Convert μs to ms
-                        
-                        # Track start time (lowest timestamp)
-                        span_start = span.get("startTime", 0)
-                        if start_time is None or span_start < start_time:
-                            start_time = span_start
-                        
-                        # Track services and operations
-                        process_id = span.get("processID")
-                        if process_id and process_id in trace.get("processes", {}):
-                            service_name = trace.get("processes", {}).get(process_id, {}).get("serviceName", "unknown")
-                            services.add(service_name)
-                        
-                        operations.add(span.get("operationName", "unknown"))
-                    
+            
+            for summary in map(summarize_trace, iter_jaeger_traces(response)):
+                trace_count += 1
+                if HAS_RICH:
                     # Format start time
                     start_time_str = "Unknown"
-                    if start_time:
-                        start_time_date = datetime.datetime.fromtimestamp(start_time / 1000000)  # Convert μs to seconds
+                    if summary.start_time_us:
+                        start_time_date = datetime.datetime.fromtimestamp(summary.start_time_us / 1000000)  # Convert μs to seconds
                         start_time_str = start_time_date.strftime("%Y-%m-%d %H:%M:%S")
                     
+                    operations = summary.operations
                     table.add_row(
-                        trace_id,
-                        f"{duration_ms:.2f}",
-                        ", ".join(services),
-                        ", ".join(list(operations)[:3]) + ("..." if len(operations) > 3 else ""),
+                        summary.trace_id,
+                        f"{summary.duration_ms:.2f}",
+                        ", ".join(summary.services),
+                        ", ".join(islice(operations, 3)) + ("..." if len(operations) > 3 else ""),
                         start_time_str
                     )
+                else:
+                    # Simple output for non-rich environments
+                    if trace_count == 1:
+                        print("Traces found:")
+                    print(f"{trace_count}. Trace ID: {summary.trace_id}, Spans: {summary.span_count}, Services: {', '.join(summary.services)}")
+            
+            if trace_count == 0:
+                print_warning("No traces found matching the criteria.")
                 
-                console.print(table)
+                # If no traces were found but Jaeger is running, try to diagnose
+                if len(services_data) <= 1 and "jaeger-query" in services_data:
+                    print_info("No services are reporting traces to Jaeger.")
+                    print_info("Check that your applications are properly instrumented and running.")
+                    print_info("Remember to generate some traffic to create traces.")
+                else:
+                    print_info(f"Available services: {', '.join(services_data)}")
+                    print_info("Try querying traces for a specific service.")
+                return
+            
+            # Display results in a table
+            if HAS_RICH:
+                table.title = f"Traces ({trace_count} results)"
+                get_console().print(table)
                 
                 # Ask user if they want to open any trace in the browser
-                trace_to_open = console.input("Enter trace ID to open in browser (or press Enter to skip): ")
+                trace_to_open = get_console().input("Enter trace ID to open in browser (or press Enter to skip): ")
                 if trace_to_open:
-                    trace_url = f"http://localhost:16686/trace/{trace_to_open}"
-                    
-                    if sys.platform == 'darwin':  # macOS
-                        run_command(['open', trace_url], shell=False)
-                    elif sys.platform.startswith('linux'):
-                        run_command(['xdg-open', trace_url], shell=False)
-                    elif sys.platform == 'win32':  # Windows
-                        run_command(['start', trace_url], shell=True)
-                    
+                    trace_url = f"{JAEGER_URL}/trace/{trace_to_open}"
+                    webbrowser.open(trace_url, new=2)
                     print_info(f"Opening trace: {trace_url}")
-            else:
-                # Simple output for non-rich environments
-                print("Traces found:")
-                for i, trace in enumerate(traces["data"], 1):
-                    trace_id = trace.get("traceID", "Unknown")
-                    spans = len(trace.get("spans", []))
-                    services = set()
-                    
-                    for span in trace.get("spans", []):
-                        process_id = span.get("processID")
-                        if process_id and process_id in trace.get("processes", {}):
-                            service_name = trace.get("processes", {}).get(process_id, {}).get("serviceName", "unknown")
-                            services.add(service_name)
-                    
-                    print(f"{i}. Trace ID: {trace_id}, Spans: {spans}, Services: {', '.join(services)}")
-        except json.JSONDecodeError:
+        except JSON_DECODE_ERRORS:
             print_error("Failed to parse Jaeger response. Is Jaeger running?")
-            print_info("Response: " + result.stdout[:100] + "..." if len(result.stdout) > 100 else result.stdout)
+            body = response.text
+            print_info("Response: " + body[:100] + "..." if len(body) > 100 else body)
     except Exception as e:
         print_error(f"Error querying traces: {e}")
         
+def write_sampling_override(service, environment):
+    """Write the compose override that sets a service's sampler environment"""
+    lines = ["services:", f"  {service}:", "    environment:"]
+    lines.extend(f"      - {name}={value}" for name, value in environment.items())
+    SAMPLING_OVERRIDE_FILES[service].write_text("\n".join(lines) + "\n")
+
 def set_sampling_rate(service, rate):
     """Set the sampling rate for a service"""
     if service not in ["api", "frontend"]:
         print_error(f"Unsupported service: {service}. Use 'api' or 'frontend'.")
         return
     
-    compose_file = COMPOSE_DEV  # Use dev compose file by default
-    
     rate_float = float(rate)
     if rate_float < 0 or rate_float > 1:
         print_error("Sampling rate must be between 0 and 1 (e.g., 0.1 for 10% sampling)")
@@ -938,25 +1219,24 @@ def set_sampling_rate(service, rate):
         
         # First, check current rate
         current_config = run_command(
-            ["docker", "compose", "-f", str(compose_file), "exec", "api", "printenv", "OTEL_TRACES_SAMPLER_ARG"],
+            compose_base("dev") + ["exec", "api", "printenv", "OTEL_TRACES_SAMPLER_ARG"],
             capture_output=True
         )
         
         print_info(f"Current sampling rate: {current_config or 'not set'}")
         
-        # Apply new configuration
-        env_vars = {
+        # Apply new configuration; the OTel SDK only reads these at startup, so
+        # they go into the API's override for the next (re)creation
+        write_sampling_override("api", {
             "OTEL_TRACES_SAMPLER": "parentbased_traceidratio",
-            "OTEL_TRACES_SAMPLER_ARG": str(rate_float)
-        }
-        
-        for var_name, var_value in env_vars.items():
-            run_command(["docker", "compose", "-f", str(compose_file), "exec", "api", "sh", "-c", f"export {var_name}={var_value}"])
+            "OTEL_TRACES_SAMPLER_ARG": rate_float,
+        })
         
         print_warning("Note: Changes require service restart to take full effect.")
         restart = input("Restart API service now? [y/N]: ")
         if restart.lower() == 'y':
-            run_command(["docker", "compose", "-f", str(compose_file), "restart", "api"])
+            # `up` rather than `restart`, which would keep the old environment
+            run_command(compose_base("dev") + ["up", "-d", "--no-deps", "api"])
             print_success("API service restarted with new sampling rate.")
         else:
             print_info("Changes will take effect on next service restart.")
@@ -965,26 +1245,16 @@ def set_sampling_rate(service, rate):
         # For frontend, we need to modify the environment variables in the container
         print_info(f"Setting frontend sampling rate to {rate_float}...")
         
-        # This is more complex for frontend since it's built into the app
-        print_warning("For frontend, sampling rate changes require rebuilding the service.")
-        rebuild = input("Rebuild frontend with new sampling rate? [y/N]: ")
-        if rebuild.lower() == 'y':
-            # Create a temporary Dockerfile with the new sampling rate
-            with open("services/frontend/Dockerfile.temp", "w") as f:
-                f.write(f"""# Temporary Dockerfile with custom sampling rate
-FROM docker-microservices-project-frontend
-ENV REACT_APP_OTEL_SAMPLING_RATIO={rate_float}
-""")
-            
-            run_command(["docker", "build", "-t", "frontend-custom-sampling", "-f", "services/frontend/Dockerfile.temp", "services/frontend"])
-            run_command(["docker", "compose", "-f", str(compose_file), "stop", "frontend"])
-            run_command(["docker", "compose", "-f", str(compose_file), "rm", "-f", "frontend"])
-            
-            # Update the compose file to use the custom image
-            # This is a simplified approach - in practice you'd want to update the compose file properly
-            run_command(["docker", "run", "-d", "--name", "frontend", "--network", "microservices_app-network", "-p", "80:80", "frontend-custom-sampling"])
+        # The dev server reads REACT_APP_* variables when it starts, so the new
+        # ratio only needs the container recreated with it
+        print_warning("For frontend, sampling rate changes require recreating the service.")
+        recreate = input("Recreate frontend with new sampling rate? [y/N]: ")
+        if recreate.lower() == 'y':
+            write_sampling_override("frontend", {"REACT_APP_OTEL_SAMPLING_RATIO": rate_float})
+            # compose_base picks the override up, so later starts keep the ratio
+            run_command(compose_base("dev") + ["up", "-d", "--no-deps", "frontend"])
             
-            print_success("Frontend rebuilt with new sampling rate.")
+            print_success("Frontend recreated with new sampling rate.")
         else:
             print_info("No changes applied.")
 
@@ -993,109 +1263,122 @@ def generate_trace_summary(days=1):
     print_info(f"Generating trace summary for the past {days} days...")
     
     # Calculate timestamp for start of the period (in microseconds)
-    start_time = int((datetime.datetime.now() - datetime.timedelta(days=days)).timestamp() * 1000000)
+    start_time = (time.time_ns() - days * 86_400 * 1_000_000_000) // 1000
     
     # Query all traces since that time
-    query_url = f"http://localhost:16686/api/traces?start={start_time}&limit=1000"
+    query_url = f"{JAEGER_URL}/api/traces?start={start_time}&limit=1000"
+    
+    # Check that Jaeger is running while the traces are being fetched
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        services_future = executor.submit(jaeger_services)
+        traces_future = executor.submit(get_http_session().get, query_url, timeout=30, stream=True)
+    
+    if services_future.result() is None:
+        print_error("Jaeger is not running. Start it with: ./microservices start-tracing")
+        return
     
     try:
-        result = subprocess.run(["curl", "-s", query_url], capture_output=True, text=True)
-        if result.returncode != 0:
-            print_error(f"Failed to query traces: {result.stderr}")
+        try:
+            response = traces_future.result()
+        except Exception as e:
+            print_error(f"Failed to query traces: {e}")
             return
         
-        # Parse JSON response
+        # Analyze traces as the response streams in, one at a time
         try:
-            traces = json.loads(result.stdout)
-            
-            if not traces.get("data") or len(traces["data"]) == 0:
-                print_warning("No traces found for the specified period.")
-                return
-            
-            # Analyze trace data
-            trace_count = len(traces["data"])
+            trace_count = 0
             
             # Count by service
-            services_count = {}
-            # Track durations
-            durations = []
-            # Track span counts
-            span_counts = []
+            services_count = Counter()
+            # Track durations and span counts in typed arrays so NumPy can
+            # wrap them without copying
+            durations = array("d")
+            span_counts = array("q")
             # Track error counts
             error_count = 0
             
-            for trace in traces["data"]:
-                # Count spans
-                spans = trace.get("spans", [])
-                span_counts.append(len(spans))
-                
-                # Track max duration
-                max_duration = 0
-                
-                for span in spans:
-                    max_duration = max(max_duration, span.get("duration", 0))
-                    
-                    # Check for errors
-                    for tag in span.get("tags", []):
-                        if tag.get("key") == "error" and tag.get("value") == "true":
-                            error_count += 1
-                            break
-                    
-                    # Track services
-                    process_id = span.get("processID")
-                    if process_id and process_id in trace.get("processes", {}):
-                        service_name = trace.get("processes", {}).get(process_id, {}).get("serviceName", "unknown")
-                        services_count[service_name] = services_count.get(service_name, 0) + 1
-                
-                # Convert duration to milliseconds
-                durations.append(max_duration / 1000)
+            for summary in map(summarize_trace, iter_jaeger_traces(response)):
+                trace_count += 1
+                span_counts.append(summary.span_count)
+                durations.append(summary.duration_ms)
+                error_count += summary.error_count
+                services_count.update(summary.services)
+            
+            if trace_count == 0:
+                print_warning("No traces found for the specified period.")
+                return
             
             # Calculate statistics
-            avg_duration = sum(durations) / len(durations) if durations else 0
-            max_duration = max(durations) if durations else 0
-            min_duration = min(durations) if durations else 0
-            p95_duration = sorted(durations)[int(len(durations) * 0.95)] if durations else 0
+            try:
+                import numpy as np
+            except ImportError:
+                np = None
             
-            avg_spans = sum(span_counts) / len(span_counts) if span_counts else 0
-            max_spans = max(span_counts) if span_counts else 0
+            if np is not None:
+                # Vectorized stats; the percentile uses a partial selection instead of a
+                # full sort and picks an actual sample, like the fallback below
+                duration_values = np.frombuffer(durations, dtype=np.float64)
+                span_values = np.frombuffer(span_counts, dtype=np.int64)
+                
+                avg_duration = float(duration_values.mean())
+                max_duration = float(duration_values.max())
+                min_duration = float(duration_values.min())
+                try:
+                    p95_duration = float(np.percentile(duration_values, 95, method="higher"))
+                except TypeError:
+                    # NumPy < 1.22 has no method= argument; use the same pick as the fallback
+                    p95_duration = sorted(durations)[int(len(durations) * 0.95)]
+                
+                span_total = int(span_values.sum())
+                avg_spans = float(span_values.mean())
+                max_spans = int(span_values.max())
+            else:
+                avg_duration = sum(durations) / len(durations)
+                max_duration = max(durations)
+                min_duration = min(durations)
+                p95_duration = sorted(durations)[int(len(durations) * 0.95)]
+                
+                span_total = sum(span_counts)
+                avg_spans = span_total / len(span_counts)
+                max_spans = max(span_counts)
             
-            error_rate = (error_count / sum(span_counts)) * 100 if span_counts else 0
+            error_rate = (error_count / span_total) * 100 if span_total else 0
             
             # Print summary
             if HAS_RICH:
-                console.print("[bold]Trace Summary[/bold]")
-                console.print(f"Period: Past {days} days")
-                console.print(f"Total Traces: {trace_count}")
-                console.print(f"Total Spans: {sum(span_counts)}")
-                console.print(f"Error Rate: {error_rate:.2f}%")
+                get_console().print("[bold]Trace Summary[/bold]")
+                get_console().print(f"Period: Past {days} days")
+                get_console().print(f"Total Traces: {trace_count}")
+                get_console().print(f"Total Spans: {span_total}")
+                get_console().print(f"Error Rate: {error_rate:.2f}%")
                 
-                console.print("\n[bold]Duration Statistics (ms)[/bold]")
-                console.print(f"Average: {avg_duration:.2f}")
-                console.print(f"Minimum: {min_duration:.2f}")
-                console.print(f"Maximum: {max_duration:.2f}")
-                console.print(f"95th Percentile: {p95_duration:.2f}")
+                get_console().print("\n[bold]Duration Statistics (ms)[/bold]")
+                get_console().print(f"Average: {avg_duration:.2f}")
+                get_console().print(f"Minimum: {min_duration:.2f}")
+                get_console().print(f"Maximum: {max_duration:.2f}")
+                get_console().print(f"95th Percentile: {p95_duration:.2f}")
                 
-                console.print("\n[bold]Span Statistics[/bold]")
-                console.print(f"Average Spans per Trace: {avg_spans:.2f}")
-                console.print(f"Maximum Spans in a Trace: {max_spans}")
+                get_console().print("\n[bold]Span Statistics[/bold]")
+                get_console().print(f"Average Spans per Trace: {avg_spans:.2f}")
+                get_console().print(f"Maximum Spans in a Trace: {max_spans}")
                 
                 # Service distribution table
-                table = Table(title="Service Distribution")
+                table = make_table(title="Service Distribution")
                 table.add_column("Service", style="cyan")
                 table.add_column("Span Count", style="magenta")
                 table.add_column("Percentage", style="green")
                 
                 total_spans = sum(services_count.values())
-                for service, count in sorted(services_count.items(), key=lambda x: x[1], reverse=True):
+                for service, count in services_count.most_common():
                     percentage = (count / total_spans) * 100 if total_spans else 0
                     table.add_row(service, str(count), f"{percentage:.2f}%")
                 
-                console.print(table)
+                get_console().print(table)
             else:
                 print("Trace Summary")
                 print(f"Period: Past {days} days")
                 print(f"Total Traces: {trace_count}")
-                print(f"Total Spans: {sum(span_counts)}")
+                print(f"Total Spans: {span_total}")
                 print(f"Error Rate: {error_rate:.2f}%")
                 
                 print("\nDuration Statistics (ms)")
@@ -1110,47 +1393,78 @@ def generate_trace_summary(days=1):
                 
                 print("\nService Distribution")
                 total_spans = sum(services_count.values())
-                for service, count in sorted(services_count.items(), key=lambda x: x[1], reverse=True):
+                for service, count in services_count.most_common():
                     percentage = (count / total_spans) * 100 if total_spans else 0
                     print(f"{service}: {count} spans ({percentage:.2f}%)")
         
-        except json.JSONDecodeError:
+        except JSON_DECODE_ERRORS:
             print_error("Failed to parse Jaeger response. Is Jaeger running?")
     
     except Exception as e:
         print_error(f"Error generating trace summary: {e}")
 
+def parse_ab_output(output):
+    """Extract benchmark metrics from Apache Benchmark's report"""
+    # ab prints some lines more than once, so keep the first occurrence of each
+    metrics = {}
+    for match in AB_METRICS_RE.finditer(output):
+        if match["rps"]:
+            metrics.setdefault("rps", float(match["rps"]))
+        elif match["time_per_request"]:
+            metrics.setdefault("time_per_request", float(match["time_per_request"]))
+        else:
+            metrics.setdefault(f"p{match['pct']}", int(match["pct_value"]))
+    return metrics
+
+def parse_hey_csv(output, concurrency):
+    """Compute the metrics ab reports from hey's per-request CSV output"""
+    rows = list(csv.DictReader(io.StringIO(output)))
+    if not rows:
+        return {}
+    
+    latencies = sorted(float(row["response-time"]) for row in rows)
+    elapsed = max(float(row["offset"]) + float(row["response-time"]) for row in rows)
+    count = len(latencies)
+    
+    # Same definitions as ab: throughput over the whole run, mean time per request
+    # per concurrent client, and nearest-rank percentiles in whole milliseconds
+    metrics = {
+        "rps": count / elapsed,
+        "time_per_request": concurrency * elapsed / count * 1000,
+    }
+    for pct in (50, 95, 99):
+        metrics[f"p{pct}"] = round(latencies[math.ceil(count * pct / 100) - 1] * 1000)
+    return metrics
+
 def benchmark_api(endpoint="/health", requests=100, concurrency=10):
     """
     Run a performance benchmark against the API with tracing enabled
     and compare with tracing disabled
     """
-    compose_file = COMPOSE_DEV  # Use dev compose file by default
-    
     print_info(f"Benchmarking API endpoint: {endpoint}")
     print_info(f"Requests: {requests}, Concurrency: {concurrency}")
     
     results = {}
     
-    # Check if Apache Benchmark is installed
-    ab_installed = run_command(["which", "ab"], capture_output=True)
-    if not ab_installed:
-        print_error("Apache Benchmark (ab) not found. Please install apache2-utils.")
+    # Prefer hey, which keeps connections alive and reports every request;
+    # otherwise fall back to Apache Benchmark
+    use_hey = has_tool("hey")
+    if not use_hey and not has_tool("ab"):
+        print_error("Neither hey nor Apache Benchmark (ab) found. Please install hey or apache2-utils.")
         return
     
+    # The running dev API already has tracing enabled, so the traced pass runs
+    # against it as-is and only the untraced pass needs a recreated container
+    tracing_disabled = False
     for mode in ["tracing", "no-tracing"]:
         print_info(f"\nRunning benchmark with {mode}...")
         
-        # Configure tracing based on mode
-        if mode == "tracing":
-            run_command(["docker", "compose", "-f", str(compose_file), "exec", "-e", "ENABLE_TRACING=true", "api", "sh", "-c", "echo 'Tracing enabled'"])
-        else:
-            run_command(["docker", "compose", "-f", str(compose_file), "exec", "-e", "ENABLE_TRACING=false", "api", "sh", "-c", "echo 'Tracing disabled'"])
-        
-        # Need to restart API to apply changes
-        print_info("Restarting API to apply tracing changes...")
-        run_command(["docker", "compose", "-f", str(compose_file), "restart", "api"])
-        time.sleep(5)  # Wait for API to be ready
+        if mode == "no-tracing":
+            print_info("Recreating API with tracing disabled...")
+            tracing_disabled = True
+            if not set_api_tracing(False):
+                print_error("API did not become ready with tracing disabled.")
+                break
         
         # Check if the endpoint requires authentication
         requires_auth = endpoint not in ["/health", "/", "/metrics"]
@@ -1160,8 +1474,13 @@ def benchmark_api(endpoint="/health", requests=100, concurrency=10):
             print_warning(f"Endpoint {endpoint} may require authentication.")
             print_info("Skipping authentication for benchmark.")
         
-        print_info(f"Running benchmark against http://localhost:8000{endpoint}...")
-        benchmark_cmd = ["ab", "-n", str(requests), "-c", str(concurrency), f"http://localhost:8000{endpoint}"]
+        url = f"http://localhost:8000{endpoint}"
+        print_info(f"Running benchmark against {url}...")
+        if use_hey:
+            benchmark_cmd = ["hey", "-n", str(requests), "-c", str(concurrency), "-o", "csv", url]
+        else:
+            # -k reuses connections so the run measures the API, not TCP setup
+            benchmark_cmd = ["ab", "-k", "-n", str(requests), "-c", str(concurrency), url]
         
         # Run benchmark
         result = subprocess.run(benchmark_cmd, capture_output=True, text=True)
@@ -1172,106 +1491,60 @@ def benchmark_api(endpoint="/health", requests=100, concurrency=10):
             continue
         
         # Extract key metrics
-        output = result.stdout
-        
-        # Parse the output for key metrics
-        metrics = {}
-        
-        # Requests per second
-        rps_match = re.search(r"Requests per second:\s+([\d.]+)", output)
-        if rps_match:
-            metrics["rps"] = float(rps_match.group(1))
-        
-        # Time per request
-        tpr_match = re.search(r"Time per request:\s+([\d.]+)", output)
-        if tpr_match:
-            metrics["time_per_request"] = float(tpr_match.group(1))
-        
-        # 50th percentile
-        p50_match = re.search(r"50%\s+([\d]+)", output)
-        if p50_match:
-            metrics["p50"] = int(p50_match.group(1))
-        
-        # 95th percentile
-        p95_match = re.search(r"95%\s+([\d]+)", output)
-        if p95_match:
-            metrics["p95"] = int(p95_match.group(1))
-        
-        # 99th percentile
-        p99_match = re.search(r"99%\s+([\d]+)", output)
-        if p99_match:
-            metrics["p99"] = int(p99_match.group(1))
-        
-        # Store results
-        results[mode] = metrics
+        if use_hey:
+            results[mode] = parse_hey_csv(result.stdout, concurrency)
+        else:
+            results[mode] = parse_ab_output(result.stdout)
     
     # Compare results
     if "tracing" in results and "no-tracing" in results:
+        # Format every row once, then render it with or without Rich
+        rows = []
+        for metric in ["rps", "time_per_request", "p50", "p95", "p99"]:
+            if metric in results["tracing"] and metric in results["no-tracing"]:
+                with_tracing = results["tracing"][metric]
+                without_tracing = results["no-tracing"][metric]
+                diff = with_tracing - without_tracing
+                diff_percent = (diff / without_tracing) * 100 if without_tracing else 0
+                
+                # Format based on metric
+                if metric == "rps":
+                    metric_name = "Requests per second"
+                elif metric == "time_per_request":
+                    metric_name = "Time per request (ms)"
+                else:
+                    metric_name = f"{metric} response time (ms)"
+                
+                if isinstance(with_tracing, float):
+                    rows.append((metric_name, f"{with_tracing:.2f}", f"{without_tracing:.2f}", f"{diff:.2f} ({diff_percent:+.2f}%)"))
+                else:
+                    rows.append((metric_name, str(with_tracing), str(without_tracing), f"{diff} ({diff_percent:+.2f}%)"))
+        
         if HAS_RICH:
-            table = Table(title="Benchmark Results Comparison")
+            table = make_table(title="Benchmark Results Comparison")
             table.add_column("Metric", style="cyan")
             table.add_column("With Tracing", style="magenta")
             table.add_column("Without Tracing", style="green")
             table.add_column("Difference", style="yellow")
+            for row in rows:
+                table.add_row(*row)
             
-            # Add metrics rows
-            for metric in ["rps", "time_per_request", "p50", "p95", "p99"]:
-                if metric in results["tracing"] and metric in results["no-tracing"]:
-                    with_tracing = results["tracing"][metric]
-                    without_tracing = results["no-tracing"][metric]
-                    diff = with_tracing - without_tracing
-                    diff_percent = (diff / without_tracing) * 100
-                    
-                    # Format based on metric
-                    if metric == "rps":
-                        metric_name = "Requests per second"
-                        with_tracing_str = f"{with_tracing:.2f}"
-                        without_tracing_str = f"{without_tracing:.2f}"
-                        diff_str = f"{diff:.2f} ({diff_percent:+.2f}%)"
-                    elif metric == "time_per_request":
-                        metric_name = "Time per request (ms)"
-                        with_tracing_str = f"{with_tracing:.2f}"
-                        without_tracing_str = f"{without_tracing:.2f}"
-                        diff_str = f"{diff:.2f} ({diff_percent:+.2f}%)"
-                    else:
-                        metric_name = f"{metric} response time (ms)"
-                        with_tracing_str = str(with_tracing)
-                        without_tracing_str = str(without_tracing)
-                        diff_str = f"{diff} ({diff_percent:+.2f}%)"
-                    
-                    table.add_row(metric_name, with_tracing_str, without_tracing_str, diff_str)
-            
-            console.print(table)
+            get_console().print(table)
         else:
+            row_format = "{:<25} {:<15} {:<15} {:<15}"
             print("\nBenchmark Results Comparison:")
-            print(f"{'Metric':<25} {'With Tracing':<15} {'Without Tracing':<15} {'Difference':<15}")
+            print(row_format.format("Metric", "With Tracing", "Without Tracing", "Difference"))
             print("-" * 70)
-            
-            for metric in ["rps", "time_per_request", "p50", "p95", "p99"]:
-                if metric in results["tracing"] and metric in results["no-tracing"]:
-                    with_tracing = results["tracing"][metric]
-                    without_tracing = results["no-tracing"][metric]
-                    diff = with_tracing - without_tracing
-                    diff_percent = (diff / without_tracing) * 100
-                    
-                    # Format based on metric
-                    if metric == "rps":
-                        metric_name = "Requests per second"
-                        print(f"{metric_name:<25} {with_tracing:.2f:<15.2f} {without_tracing:.2f:<15.2f} {diff:.2f} ({diff_percent:+.2f}%)")
-                    elif metric == "time_per_request":
-                        metric_name = "Time per request (ms)"
-                        print(f"{metric_name:<25} {with_tracing:.2f:<15.2f} {without_tracing:.2f:<15.2f} {diff:.2f} ({diff_percent:+.2f}%)")
-                    else:
-                        metric_name = f"{metric} response time (ms)"
-                        print(f"{metric_name:<25} {with_tracing:<15} {without_tracing:<15} {diff} ({diff_percent:+.2f}%)")
+            for row in rows:
+                print(row_format.format(*row))
     
     else:
         print_error("Could not compare results. Ensure both benchmarks completed successfully.")
     
     # Restore tracing to enabled state
-    run_command(["docker", "compose", "-f", str(compose_file), "exec", "-e", "ENABLE_TRACING=true", "api", "sh", "-c", "echo 'Restoring tracing to enabled state'"])
-    run_command(["docker", "compose", "-f", str(compose_file), "restart", "api"])
-    print_info("API service restarted with tracing enabled.")
+    if tracing_disabled:
+        set_api_tracing(True)
+        print_info("API service recreated with tracing enabled.")
 
 def integrate_slo_commands(args_list):
     """Integrate SLO management commands"""
@@ -1284,179 +1557,188 @@ def integrate_slo_commands(args_list):
     except Exception as e:
         print_error(f"Error executing SLO command: {e}")
 
-def main():
-    """Main CLI entry point"""
+def handle_restart(args):
+    """Handle the restart command, taking the service from --service or --services"""
+    service = args.service or (args.services[0] if args.services else None)
+    if not service:
+        print_error("Please specify a service to restart with --service")
+        return
+    restart_service(args.env, service)
+
+def handle_scale(args):
+    """Handle the scale command"""
+    if not args.service:
+        print_error("Please specify a service to scale with --service")
+        return
+    scale_service(args.env, args.service, args.replicas or 1)
+
+def handle_slo(args):
+    """Hand the slo subcommand and its arguments to the SLO manager"""
+    # Accept both `slo --subcommand status ...` and `slo status ...`
+    slo_args = ([args.subcommand] if args.subcommand else []) + args.subargs
+    if not slo_args:
+        print_error("SLO command requires a subcommand. Try 'slo status', 'slo alerts', or 'slo test'")
+        return
+    integrate_slo_commands(slo_args)
+
+def handle_query_traces(args):
+    """Handle the query-traces command, parsing key=value tag filters"""
+    tags = {}
+    for tag_pair in args.tag or []:
+        if '=' in tag_pair:
+            key, value = tag_pair.split('=', 1)
+            tags[key] = value
+    query_traces(args.service, args.operation, tags, args.limit)
+
+def handle_sampling_rate(args):
+    """Handle the sampling-rate command"""
+    if not args.service:
+        print_error("Please specify a service with --service (api or frontend)")
+        return
+    if args.rate is None:
+        print_error("Please specify a sampling rate with --rate (0.0-1.0)")
+        return
+    set_sampling_rate(args.service, args.rate)
+
+def handle_all(args):
+    """Build, start, check, test and scan in one go"""
+    build_services(args.env, args.services, args.jobs)
+    start_services(args.env, args.services)
+    time.sleep(10)  # Give services more time to fully initialize
+    check_services_health(args.env)
+    run_tests(args.env)
+    scan_images(args.services)
+
+def build_parser():
+    """Build the CLI parser with one sub-parser per command"""
     parser = argparse.ArgumentParser(description="Docker Microservices Project CLI")
-    
-    # Original commands
-    parser.add_argument("command", choices=[
-        "build", "start", "stop", "status", "scan", "test", "logs",
-        "start-monitoring", "stop-monitoring", "stats", "dependency-graph", 
-        "network-check", "restart", "scale", "security-check", 
-        "start-tracing", "stop-tracing", "check-tracing",
-        # Tracing commands
-        "query-traces", "sampling-rate", "trace-summary", "slo", "benchmark",
-        "all"
-    ], help="Command to execute")
-    
-    # Existing arguments
-    parser.add_argument("--env", choices=["dev", "prod"], required=True, 
+    parser.add_argument("--env", choices=["dev", "prod"],
                         help="Environment (dev or prod)")
-    parser.add_argument("--services", nargs="+", 
-                        help="Specific services to target")
-    parser.add_argument("--tail", type=int, default=100, 
-                        help="Number of log lines to show")
-    parser.add_argument("--test-path", type=str,
-                        help="Specific test path to run")
-    parser.add_argument("--service", type=str, 
-                        help="Specific service to target for single-service operations")
-    parser.add_argument("--replicas", type=int, 
-                        help="Number of replicas for scaling")
-    parser.add_argument("--subcommand", dest="subcommand", help="Subcommand for multi-level commands")
-    parser.add_argument("subargs", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
-    # New tracing-specific arguments
-    parser.add_argument("--operation", type=str,
-                       help="Filter traces by operation name")
-    parser.add_argument("--tag", nargs="+",
-                       help="Filter traces by tags (format: key=value)")
-    parser.add_argument("--limit", type=int, default=20,
-                       help="Limit number of traces to query")
-    parser.add_argument("--rate", type=float,
-                       help="Sampling rate (0.0-1.0) for tracing")
-    parser.add_argument("--days", type=int, default=1,
-                       help="Number of days to include in trace summary")
-    parser.add_argument("--requests", type=int, default=100,
-                       help="Number of requests for benchmarking")
-    parser.add_argument("--concurrency", type=int, default=10,
-                       help="Concurrency level for benchmarking")
-    parser.add_argument("--endpoint", type=str, default="/health",
-                       help="API endpoint for benchmarking")
     
+    # --env may also follow the command; SUPPRESS keeps the sub-parser from
+    # overwriting a value given before it
+    env_parent = argparse.ArgumentParser(add_help=False)
+    env_parent.add_argument("--env", choices=["dev", "prod"], default=argparse.SUPPRESS,
+                            help="Environment (dev or prod)")
+    
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True,
+                                     help="Command to execute")
+    
+    def add_command(name, func, help=None):
+        command = commands.add_parser(name, parents=[env_parent], help=help)
+        command.set_defaults(func=func)
+        return command
+    
+    def add_services(command):
+        command.add_argument("--services", nargs="+",
+                             help="Specific services to target")
+    
+    def add_service(command, help="Specific service to target for single-service operations"):
+        command.add_argument("--service", type=str, help=help)
+    
+    # Original commands
+    command = add_command("build", lambda args: build_services(args.env, args.services, args.jobs))
+    add_services(command)
+    command.add_argument("--jobs", type=int,
+                         help="Maximum number of services to build in parallel")
+    
+    add_services(add_command("start", lambda args: start_services(args.env, args.services)))
+    add_command("stop", lambda args: stop_services(args.env))
+    add_command("status", lambda args: check_services_health(args.env))
+    add_command("migrate", lambda args: run_migrations(args.env))
+    add_services(add_command("scan", lambda args: scan_images(args.services)))
+    
+    command = add_command("test", lambda args: run_tests(args.env, args.test_path))
+    command.add_argument("--test-path", type=str,
+                         help="Specific test path to run")
+    
+    command = add_command("logs", lambda args: show_logs(
+        args.env, args.service or (args.services[0] if args.services else None), args.tail))
+    add_service(command)
+    add_services(command)
+    command.add_argument("--tail", type=int, default=100,
+                         help="Number of log lines to show")
+    
+    add_command("start-monitoring", lambda args: start_monitoring())
+    add_command("stop-monitoring", lambda args: stop_monitoring())
+    add_command("stats", lambda args: show_container_stats())
+    add_command("dependency-graph", lambda args: generate_dependency_graph())
+    add_command("network-check", lambda args: network_check())
+    
+    command = add_command("restart", handle_restart)
+    add_service(command)
+    add_services(command)
+    
+    command = add_command("scale", handle_scale)
+    add_service(command)
+    command.add_argument("--replicas", type=int,
+                         help="Number of replicas for scaling")
+    
+    add_command("security-check", lambda args: security_check())
+    add_command("start-tracing", lambda args: start_tracing())
+    add_command("stop-tracing", lambda args: stop_tracing())
+    add_command("check-tracing", lambda args: check_tracing_status())
+    add_command("start-all", lambda args: start_all(args.env))
+    
+    # Tracing commands
+    command = add_command("query-traces", handle_query_traces)
+    add_service(command)
+    command.add_argument("--operation", type=str,
+                         help="Filter traces by operation name")
+    command.add_argument("--tag", nargs="+",
+                         help="Filter traces by tags (format: key=value)")
+    command.add_argument("--limit", type=int, default=20,
+                         help="Limit number of traces to query")
+    
+    command = add_command("sampling-rate", handle_sampling_rate)
+    add_service(command, help="Service to configure (api or frontend)")
+    command.add_argument("--rate", type=float,
+                         help="Sampling rate (0.0-1.0) for tracing")
+    
+    command = add_command("trace-summary", lambda args: generate_trace_summary(args.days))
+    command.add_argument("--days", type=int, default=1,
+                         help="Number of days to include in trace summary")
+    
+    command = add_command("slo", handle_slo)
+    command.add_argument("--subcommand", dest="subcommand", help="Subcommand for multi-level commands")
+    command.add_argument("subargs", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    
+    command = add_command("benchmark", lambda args: benchmark_api(args.endpoint, args.requests, args.concurrency))
+    command.add_argument("--requests", type=int, default=100,
+                         help="Number of requests for benchmarking")
+    command.add_argument("--concurrency", type=int, default=10,
+                         help="Concurrency level for benchmarking")
+    command.add_argument("--endpoint", type=str, default="/health",
+                         help="API endpoint for benchmarking")
+    
+    command = add_command("all", handle_all)
+    add_services(command)
+    command.add_argument("--jobs", type=int,
+                         help="Maximum number of services to build in parallel")
+    
+    return parser
+
+def main():
+    """Main CLI entry point"""
+    parser = build_parser()
     args = parser.parse_args()
+    if not args.env:
+        parser.error("the following arguments are required: --env")
 
     environment = args.env
     print_info(f"Using environment: {environment}")
     
     # Display startup banner
     if HAS_RICH:
-        console.print("[bold magenta]=====================================[/bold magenta]")
-        console.print("[bold magenta]Docker Microservices Project Manager[/bold magenta]")
-        console.print("[bold magenta]=====================================[/bold magenta]")
+        get_console().print("[bold magenta]=====================================[/bold magenta]")
+        get_console().print("[bold magenta]Docker Microservices Project Manager[/bold magenta]")
+        get_console().print("[bold magenta]=====================================[/bold magenta]")
     else:
         print("=====================================")
         print("Docker Microservices Project Manager")
         print("=====================================")
     
-    # Handle original commands
-    if args.command == "build":
-        build_services(args.env, args.services)
-    
-    elif args.command == "start":
-        print(f"Debug: Before calling start_services, env = {args.env}")
-        print(f"Debug: Calling start_services with env = {args.env}")
-        start_services(environment, args.services)
-    
-    elif args.command == "stop":
-        stop_services(args.env)
-    
-    elif args.command == "status":
-        check_services_health(args.env)
-    
-    elif args.command == "scan":
-        scan_images(args.services)
-    
-    elif args.command == "test":
-        run_tests(args.env, args.test_path)
-    
-    elif args.command == "logs":
-        show_logs(args.env, args.services[0] if args.services else None, args.tail)
-    
-    elif args.command == "start-monitoring":
-        start_monitoring()
-    
-    elif args.command == "stop-monitoring":
-        stop_monitoring()
-
-    elif args.command == "dependency-graph":
-        generate_dependency_graph()
-
-    elif args.command == "stats":
-        show_container_stats()
-
-    elif args.command == "network-check":
-       network_check()
-
-    elif args.command == "restart":
-        if not args.service and args.services:
-            restart_service(args.env, args.services[0])
-        elif not args.service and not args.services:
-            print_error("Please specify a service to restart with --service")
-        else:
-            restart_service(args.env, args.service)
-
-    elif args.command == "scale":
-        if not args.service:
-            print_error("Please specify a service to scale with --service")
-        else:
-            replicas = args.replicas if args.replicas else 1
-            scale_service(args.env, args.service, replicas)
-
-    elif args.command == "security-check":
-        security_check()
-
-    elif args.command == "start-tracing":
-         start_tracing()
-
-    elif args.command == "stop-tracing":
-         stop_tracing()
-
-    elif args.command == "check-tracing":
-          check_tracing_status()
-    elif args.command == "slo":
-       if not args.subcommand:
-          print_error("SLO command requires a subcommand. Try 'slo status', 'slo alerts', or 'slo test'")
-       else:
-           slo_args = [args.subcommand] + (args.subargs if args.subargs else [])
-           integrate_slo_commands(slo_args)
-    # Handle tracing commands
-    elif args.command == "query-traces":
-        service = args.service
-        operation = args.operation
-        tags = {}
-        if args.tag:
-            for tag_pair in args.tag:
-                if '=' in tag_pair:
-                    key, value = tag_pair.split('=', 1)
-                    tags[key] = value
-        limit = args.limit
-        query_traces(service, operation, tags, limit)
-    
-    elif args.command == "sampling-rate":
-        if not args.service:
-            print_error("Please specify a service with --service (api or frontend)")
-            return
-        if args.rate is None:
-            print_error("Please specify a sampling rate with --rate (0.0-1.0)")
-            return
-        set_sampling_rate(args.service, args.rate)
-    
-    elif args.command == "trace-summary":
-        days = args.days
-        generate_trace_summary(days)
-    
-    elif args.command == "benchmark":
-        endpoint = args.endpoint
-        requests = args.requests
-        concurrency = args.concurrency
-        benchmark_api(endpoint, requests, concurrency)
-
-    elif args.command == "all":
-        build_services(args.env, args.services)
-        start_services(args.env, args.services)
-        time.sleep(10)  # Give services more time to fully initialize
-        check_services_health(args.env)
-        run_tests(args.env)
-        scan_images(args.services)
+    args.func(args)
 
 if __name__ == "__main__":
     main()
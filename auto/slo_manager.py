@@ -4,12 +4,22 @@ SLO management extensions for the microservices CLI.
 This module adds commands for monitoring and managing Service Level Objectives.
 """
 import argparse
+import asyncio
 import time
 import json
+import math
+import os
+import re
+import shutil
+import subprocess
 import sys
+import tempfile
+import functools
+import threading
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, List, Optional, Tuple, Any, Callable
 
 # Try to import rich for better display
 try:
@@ -22,34 +32,52 @@ try:
 except ImportError:
     HAS_RICH = False
 
-# Initialize Rich console if available
-if HAS_RICH:
+# orjson decodes noticeably faster than the stdlib; its errors subclass JSONDecodeError
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# aiohttp lets `slo test` generate load in-process instead of shelling out to ab
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Rich styling and tables are wasted on piped or redirected output, so only
+# use them on an interactive terminal
+USE_RICH = HAS_RICH and sys.stdout.isatty()
+
+# Initialize Rich console if it will be used
+if USE_RICH:
     console = Console()
 
 def print_info(message):
     """Print info message with nice formatting if Rich is available"""
-    if HAS_RICH:
+    if USE_RICH:
         console.print(f"[blue]{message}[/blue]")
     else:
         print(f"INFO: {message}")
 
 def print_success(message):
     """Print success message with nice formatting if Rich is available"""
-    if HAS_RICH:
+    if USE_RICH:
         console.print(f"[green]✅ {message}[/green]")
     else:
         print(f"SUCCESS: {message}")
         
 def print_error(message):
     """Print error message with nice formatting if Rich is available"""
-    if HAS_RICH:
+    if USE_RICH:
         console.print(f"[bold red]❌ {message}[/bold red]")
     else:
         print(f"ERROR: {message}")
 
 def print_warning(message):
     """Print warning message with nice formatting if Rich is available"""
-    if HAS_RICH:
+    if USE_RICH:
         console.print(f"[yellow]⚠️ {message}[/yellow]")
     else:
         print(f"WARNING: {message}")
@@ -82,85 +110,233 @@ SLO_DEFINITIONS = {
     }
 }
 
+# Endpoint -> name of the SLO that covers it
+ENDPOINT_TO_SLO = {
+    endpoint: slo_name
+    for slo_name, definition in SLO_DEFINITIONS.items()
+    for endpoint in definition['endpoints']
+}
+
+PROMETHEUS_URL = 'http://localhost:9090'
+
+# Pending alerts are filtered out server-side too, so only firing ones come back
+ACTIVE_ALERTS_QUERY = 'ALERTS{severity=~"warning|critical", alertname=~".*Slo.*|.*Budget.*", alertstate="firing"}'
+
+# Compliance, error budget and latency bucket series for every SLO in one
+# selector. Composing them with `or` would drop the budget series, since `or`
+# matches on every label except the metric name and they share slo/window
+SLO_SNAPSHOT_METRICS = 'slo_compliance_ratio|slo_error_budget_remaining|slo:request_latency_seconds_bucket:rate5m'
+SLO_SNAPSHOT_QUERY = f'{{__name__=~"{SLO_SNAPSHOT_METRICS}"}}'
+
+# Throughput, mean time per request and p95 from ab's report, in report order
+AB_RESULTS_RE = re.compile(
+    r'Requests per second:\s+([\d.]+)'
+    r'.*?Time per request:\s+([\d.]+) \[ms\] \(mean\)'
+    r'.*?^\s*95%\s+(\d+)',
+    re.DOTALL | re.MULTILINE
+)
+
+# ab's "Completed N requests" heartbeat, printed every 10% on longer runs
+AB_PROGRESS_RE = re.compile(r'Completed (\d+) requests')
+
+# Upper bound on Prometheus queries in flight at once
+PROMETHEUS_MAX_WORKERS = 16
+
+# Seconds a Prometheus query result is reused before it is fetched again
+PROMETHEUS_CACHE_TTL = 2.0
+
+# Largest Prometheus response body we'll decode. Anything bigger means a query
+# matched far more series than the SLO views need (e.g. a high-cardinality label)
+PROMETHEUS_MAX_RESPONSE_BYTES = 2_000_000
+
+# Last SLO snapshot, shared between CLI invocations so repeated `slo status`
+# calls don't go back to Prometheus for data it hasn't re-evaluated yet
+SLO_SNAPSHOT_CACHE_FILE = os.path.join(tempfile.gettempdir(), 'slo_status.json')
+
+# Seconds the snapshot file is trusted; SLO rules are evaluated every 15s
+SLO_SNAPSHOT_CACHE_TTL = 10
+
+# query -> (monotonic time fetched, response JSON)
+_prom_cache: Dict[str, Tuple[float, Dict]] = {}
+_prom_cache_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def get_prometheus_session() -> requests.Session:
+    """Return a shared keep-alive session sized for concurrent Prometheus queries"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=PROMETHEUS_MAX_WORKERS, pool_maxsize=PROMETHEUS_MAX_WORKERS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 def query_prometheus(query: str) -> Dict:
-    """Execute a PromQL query against Prometheus"""
+    """Execute a PromQL query against Prometheus, reusing results younger than PROMETHEUS_CACHE_TTL"""
+    with _prom_cache_lock:
+        cached = _prom_cache.get(query)
+    if cached is not None and time.monotonic() - cached[0] < PROMETHEUS_CACHE_TTL:
+        return cached[1]
+    
     try:
-        response = requests.get(
-            'http://localhost:9090/api/v1/query',
-            params={'query': query}
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
+        with get_prometheus_session().get(
+            f'{PROMETHEUS_URL}/api/v1/query',
+            params={'query': query},
+            timeout=5,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            # Read incrementally so a runaway response is dropped before it is buffered whole
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body += chunk
+                if len(body) > PROMETHEUS_MAX_RESPONSE_BYTES:
+                    raise ValueError(f"response for {query!r} exceeds {PROMETHEUS_MAX_RESPONSE_BYTES} bytes")
+        result = json_loads(body)
+    except (requests.RequestException, ValueError) as e:
+        # Failures aren't cached, so the next call retries straight away
+        with _prom_cache_lock:
+            _prom_cache.pop(query, None)
         print_error(f"Error querying Prometheus: {e}")
         return {"data": {"result": []}}
-
-def get_slo_compliance(slo_name: str, window: str = "5m") -> Optional[float]:
-    """Get the current compliance ratio for an SLO"""
-    query = f'slo_compliance_ratio{{slo="{slo_name}", window="{window}"}}'
-    result = query_prometheus(query)
-    
-    data = result.get('data', {}).get('result', [])
-    if not data:
-        return None
     
-    # Extract the value from the first result
-    return float(data[0]['value'][1])
+    with _prom_cache_lock:
+        _prom_cache[query] = (time.monotonic(), result)
+    return result
 
-def get_error_budget_remaining(slo_name: str, window: str = "5m") -> Optional[float]:
-    """Get the remaining error budget for an SLO"""
-    query = f'slo_error_budget_remaining{{slo="{slo_name}", window="{window}"}}'
+LATENCY_PERCENTILES = [50, 90, 95, 99]
+
+def histogram_quantiles(quantiles: List[float], buckets: List[Tuple[float, float]]) -> List[Optional[float]]:
+    """Estimate several quantiles from cumulative (upper bound, count) histogram buckets
+    
+    Mirrors PromQL's histogram_quantile: linear interpolation inside the bucket
+    the rank falls into, and the highest finite bound if it lands in +Inf.
+    Quantiles must be ascending, so all of them come from one walk over the buckets.
+    """
+    if len(buckets) < 2 or buckets[-1][0] != float('inf'):
+        return [None] * len(quantiles)
+    
+    total = buckets[-1][1]
+    if total <= 0:
+        return [None] * len(quantiles)
+    
+    values = []
+    remaining = iter(buckets)
+    lower_bound, lower_count = 0.0, 0.0
+    upper_bound, count = next(remaining)
+    for quantile in quantiles:
+        rank = quantile * total
+        # The +Inf bucket holds the total, so this stops there at the latest
+        while count < rank:
+            lower_bound, lower_count = upper_bound, count
+            upper_bound, count = next(remaining)
+        
+        if upper_bound == float('inf'):
+            values.append(lower_bound)
+        elif count == lower_count:
+            values.append(upper_bound)
+        else:
+            values.append(lower_bound + (upper_bound - lower_bound) * (rank - lower_count) / (count - lower_count))
+    return values
+
+def latency_percentiles(buckets: List[Tuple[float, float]]) -> Dict[str, float]:
+    """Compute every LATENCY_PERCENTILES value from sorted (upper bound, count) buckets"""
+    values = histogram_quantiles([percentile / 100 for percentile in LATENCY_PERCENTILES], buckets)
+    return {
+        f"p{percentile}": value
+        for percentile, value in zip(LATENCY_PERCENTILES, values)
+        if value is not None
+    }
+
+def fetch_slo_snapshot(slo_names: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """Fetch compliance, error budget and latency buckets for the given SLOs (default all) in one query
+    
+    Returns {slo: {"compliance": {window: ratio}, "budget_remaining": {window: ratio},
+    "buckets": [(le, count), ...]}} for whichever series Prometheus has.
+    """
+    if slo_names is None:
+        query = SLO_SNAPSHOT_QUERY
+    else:
+        query = f'{{__name__=~"{SLO_SNAPSHOT_METRICS}", slo=~"{"|".join(slo_names)}"}}'
     result = query_prometheus(query)
     
-    data = result.get('data', {}).get('result', [])
-    if not data:
+    snapshot = {}
+    for series in result.get('data', {}).get('result', []):
+        metric = series['metric']
+        if 'slo' not in metric:
+            continue
+        
+        entry = snapshot.setdefault(metric['slo'], {"compliance": {}, "budget_remaining": {}, "buckets": []})
+        value = float(series['value'][1])
+        name = metric.get('__name__')
+        if name == 'slo:request_latency_seconds_bucket:rate5m':
+            if 'le' in metric:
+                entry["buckets"].append((float(metric['le']), value))
+        elif 'window' in metric:
+            # Compliance is also labelled by endpoint; like the per-window queries, keep the first series
+            field = "compliance" if name == 'slo_compliance_ratio' else "budget_remaining"
+            entry[field].setdefault(metric['window'], value)
+    
+    for entry in snapshot.values():
+        entry["buckets"].sort()
+    
+    return snapshot
+
+def load_cached_snapshot() -> Optional[Dict[str, Dict]]:
+    """Return the snapshot saved by an earlier invocation if it is still fresh"""
+    try:
+        if time.time() - os.stat(SLO_SNAPSHOT_CACHE_FILE).st_mtime >= SLO_SNAPSHOT_CACHE_TTL:
+            return None
+        with open(SLO_SNAPSHOT_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
         return None
-    
-    # Extract the value from the first result
-    return float(data[0]['value'][1])
 
-def get_latency_percentiles(slo_name: str) -> Dict[str, float]:
-    """Get latency percentiles for an SLO"""
-    percentiles = {}
-    
-    for percentile in [50, 90, 95, 99]:
-        query = f'histogram_quantile({percentile/100}, sum(rate(slo_request_latency_seconds_bucket{{slo="{slo_name}"}}[5m])) by (le))'
-        result = query_prometheus(query)
-        
-        data = result.get('data', {}).get('result', [])
-        if data:
-            percentiles[f"p{percentile}"] = float(data[0]['value'][1])
-    
-    return percentiles
+def save_cached_snapshot(snapshot: Dict[str, Dict]):
+    """Save a snapshot for later invocations; the cache is best effort"""
+    # Write to a private file and rename it into place so readers never see half a snapshot
+    tmp_file = f"{SLO_SNAPSHOT_CACHE_FILE}.{os.getpid()}"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_file, SLO_SNAPSHOT_CACHE_FILE)
+    except OSError:
+        pass
 
-def get_all_slo_status() -> Dict[str, Dict]:
-    """Get status for all SLOs"""
-    status = {}
+def get_all_slo_status(slo_names: Optional[Iterable[str]] = None, use_cache: bool = True) -> Dict[str, Dict]:
+    """Get status for the given SLOs, or all of them
+    
+    Everything comes from a single fetch_slo_snapshot() query rather than
+    separate compliance, budget and latency queries per SLO and window, and
+    a snapshot younger than SLO_SNAPSHOT_CACHE_TTL is reused from disk.
+    """
+    if slo_names is not None:
+        slo_names = list(slo_names)
+    
+    snapshot = load_cached_snapshot() if use_cache else None
+    if snapshot is None:
+        snapshot = fetch_slo_snapshot(slo_names)
+        # Only complete snapshots are shared, and an empty one usually means
+        # Prometheus is unreachable, so don't keep that either
+        if snapshot and slo_names is None:
+            save_cached_snapshot(snapshot)
     
-    for slo_name in SLO_DEFINITIONS.keys():
+    status = {}
+    for slo_name in SLO_DEFINITIONS if slo_names is None else slo_names:
+        definition = SLO_DEFINITIONS[slo_name]
+        data = snapshot.get(slo_name, {"compliance": {}, "budget_remaining": {}, "buckets": []})
+        
+        # Walk the defined windows so they keep their order in the output
         status[slo_name] = {
-            "definition": SLO_DEFINITIONS[slo_name],
-            "compliance": {},
-            "budget_remaining": {},
-            "latency": get_latency_percentiles(slo_name)
+            "definition": definition,
+            "compliance": {w: data["compliance"][w] for w in definition["windows"] if w in data["compliance"]},
+            "budget_remaining": {w: data["budget_remaining"][w] for w in definition["windows"] if w in data["budget_remaining"]},
+            "latency": latency_percentiles(data["buckets"])
         }
-        
-        # Get compliance for each window
-        for window in SLO_DEFINITIONS[slo_name]["windows"]:
-            compliance = get_slo_compliance(slo_name, window)
-            if compliance is not None:
-                status[slo_name]["compliance"][window] = compliance
-            
-            budget = get_error_budget_remaining(slo_name, window)
-            if budget is not None:
-                status[slo_name]["budget_remaining"][window] = budget
     
     return status
 
 def get_active_alerts() -> List[Dict]:
     """Get list of active SLO-related alerts"""
-    query = 'ALERTS{severity=~"warning|critical", alertname=~".*Slo.*|.*Budget.*"}'
-    result = query_prometheus(query)
+    result = query_prometheus(ACTIVE_ALERTS_QUERY)
     
     alerts = []
     for alert in result.get('data', {}).get('result', []):
@@ -168,7 +344,7 @@ def get_active_alerts() -> List[Dict]:
             "name": alert['metric'].get('alertname', 'Unknown'),
             "severity": alert['metric'].get('severity', 'Unknown'),
             "slo": alert['metric'].get('slo', 'Unknown'),
-            "state": "firing" if float(alert['value'][1]) == 1 else "resolved",
+            "state": alert['metric'].get('alertstate', 'firing'),
             "labels": alert['metric']
         })
     
@@ -182,12 +358,16 @@ def display_slo_status(args):
         return
     
     # Get status for requested SLOs
-    if args.slo:
-        status = {args.slo: get_all_slo_status()[args.slo]}
-    else:
-        status = get_all_slo_status()
+    use_cache = not getattr(args, 'refresh', False)
+    status = get_all_slo_status([args.slo] if args.slo else None, use_cache=use_cache)
+    
+    # Nothing to tabulate if Prometheus is down or the SLO rules aren't loaded
+    if not any(slo_status['compliance'] or slo_status['budget_remaining'] or slo_status['latency']
+               for slo_status in status.values()):
+        print_warning(f"No SLO metrics found in Prometheus at {PROMETHEUS_URL} - are the SLO rules loaded?")
+        return
     
-    if HAS_RICH:
+    if USE_RICH:
         # Create a table for each SLO
         for slo_name, slo_status in status.items():
             table = Table(title=f"SLO: {slo_name} - {slo_status['definition']['description']}")
@@ -274,7 +454,7 @@ def display_slo_alerts(args):
         print_info("No active SLO alerts")
         return
     
-    if HAS_RICH:
+    if USE_RICH:
         table = Table(title="Active SLO Alerts")
         table.add_column("Alert", style="cyan")
         table.add_column("SLO", style="blue")
@@ -298,6 +478,116 @@ def display_slo_alerts(args):
         for alert in alerts:
             print(f"- {alert['name']} ({alert['severity']}) - {alert['state']}")
 
+async def _send_load(url: str, total: int, concurrency: int, rate: Optional[float] = None,
+                     on_progress: Optional[Callable[[int], None]] = None) -> Tuple[List[float], int, float]:
+    """Send `total` GETs to url from `concurrency` clients
+    
+    Without a rate each client fires its next request as soon as the previous
+    one completes, like ab. With a rate, request i is due at start + i / rate
+    and its latency is measured from that due time, so a slow response that
+    holds up later requests shows up in their latency instead of being hidden
+    by the generator backing off.
+    
+    Returns the latency of every successful request in milliseconds, the
+    number of failed requests and the wall time of the whole run in seconds.
+    """
+    latencies = []
+    failed = 0
+    sent = 0
+    
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        async def client():
+            nonlocal sent, failed
+            while sent < total:
+                index = sent
+                sent += 1
+                if rate:
+                    due = started + index / rate
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    start = int(due * 1e9)
+                else:
+                    start = time.perf_counter_ns()
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        ok = response.status < 400
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter_ns() - start) / 1e6)
+                else:
+                    failed += 1
+                if on_progress:
+                    on_progress(len(latencies) + failed)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(min(concurrency, total))))
+        elapsed = time.perf_counter() - started
+    
+    return latencies, failed, elapsed
+
+def run_load_test(url: str, total: int, concurrency: int, rate: Optional[float] = None,
+                  on_progress: Optional[Callable[[int], None]] = None) -> Optional[Tuple[float, float, float]]:
+    """Load test url in-process, returning requests per second, mean time per request and p95 in ms"""
+    latencies, failed, elapsed = asyncio.run(_send_load(url, total, concurrency, rate, on_progress))
+    if not latencies:
+        print_error(f"Load test failed: all {total} requests to {url} failed")
+        return None
+    if failed:
+        print_warning(f"{failed} of {total} requests failed")
+    
+    # Same definitions as ab: throughput over the whole run, mean time per request
+    # per concurrent client, and the nearest-rank p95 in whole milliseconds. At a
+    # fixed rate clients sit idle between requests, so the mean is taken directly
+    latencies.sort()
+    completed = len(latencies)
+    rps = completed / elapsed
+    if rate:
+        mean_time = math.fsum(latencies) / completed
+    else:
+        mean_time = concurrency * elapsed * 1000 / completed
+    p95_time = float(round(latencies[max(math.ceil(0.95 * completed) - 1, 0)]))
+    return rps, mean_time, p95_time
+
+def run_ab_test(url: str, total: int, concurrency: int, rate: Optional[float] = None,
+                on_progress: Optional[Callable[[int], None]] = None) -> Optional[Tuple[float, float, float]]:
+    """Load test url with ApacheBench, returning requests per second, mean time per request and p95 in ms
+    
+    ab only runs closed-loop, so `rate` is accepted for symmetry with run_load_test and ignored.
+    """
+    # ab reports progress on stderr, so read both streams as one while it runs
+    process = subprocess.Popen(
+        ["ab", "-n", str(total), "-c", str(concurrency), url],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1
+    )
+    lines = []
+    for line in process.stdout:
+        lines.append(line)
+        if on_progress:
+            progress_match = AB_PROGRESS_RE.match(line)
+            if progress_match:
+                on_progress(int(progress_match[1]))
+    process.wait()
+    output = "".join(lines)
+    
+    # Parse the results
+    if process.returncode != 0:
+        print_error(f"Load test failed: {output.strip().splitlines()[-1] if output.strip() else process.returncode}")
+        return None
+    
+    # Extract key metrics
+    match = AB_RESULTS_RE.search(output)
+    if not match:
+        print_error("Could not parse load test results")
+        return None
+    rps, mean_time, p95_time = map(float, match.groups())
+    return rps, mean_time, p95_time
+
 def run_slo_test(args):
     """Run a load test to verify SLO monitoring"""
     if not args.endpoint:
@@ -310,62 +600,45 @@ def run_slo_test(args):
     if not args.concurrency:
         args.concurrency = 5
     
-    # Check if ab (ApacheBench) is installed
-    try:
-        import subprocess
-        subprocess.run(["ab", "-h"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    except Exception:
-        print_error("Apache Bench (ab) is not installed or not in PATH")
-        print_info("Install with: apt-get install apache2-utils")
-        return
+    # Generate load in-process when aiohttp is available, otherwise fall back to ab
+    if HAS_AIOHTTP:
+        load_test = run_load_test
+    else:
+        # Check if ab (ApacheBench) is installed
+        if shutil.which("ab") is None:
+            print_error("Apache Bench (ab) is not installed or not in PATH")
+            print_info("Install with: apt-get install apache2-utils (or pip install aiohttp)")
+            return
+        if args.rate:
+            print_warning("--rate needs aiohttp (pip install aiohttp); running ab without a fixed rate")
+        load_test = run_ab_test
     
     # Construct the URL
     url = f"http://localhost:8000{args.endpoint}"
     
     print_info(f"Running load test against {url}")
-    print_info(f"Requests: {args.requests}, Concurrency: {args.concurrency}")
+    print_info(f"Requests: {args.requests}, Concurrency: {args.concurrency}"
+               + (f", Rate: {args.rate:g}/s" if args.rate else ""))
     
-    if HAS_RICH:
+    if USE_RICH:
         with Progress() as progress:
-            task = progress.add_task("[green]Running test...", total=1)
+            task = progress.add_task("[green]Running test...", total=args.requests)
             
-            # Run the load test
-            result = subprocess.run(
-                ["ab", "-n", str(args.requests), "-c", str(args.concurrency), url],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Run the load test, advancing the bar as requests complete
+            results = load_test(url, args.requests, args.concurrency, args.rate,
+                                on_progress=lambda done: progress.update(task, completed=done))
             
-            progress.update(task, advance=1)
+            progress.update(task, completed=args.requests)
     else:
         # Run the load test
         print("Running test...")
-        result = subprocess.run(
-            ["ab", "-n", str(args.requests), "-c", str(args.concurrency), url],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        results = load_test(url, args.requests, args.concurrency, args.rate)
     
-    # Parse the results
-    if result.returncode != 0:
-        print_error(f"Load test failed: {result.stderr}")
+    if results is None:
         return
+    rps, mean_time, p95_time = results
     
-    # Extract key metrics
-    rps = None
-    mean_time = None
-    p95_time = None
-    for line in result.stdout.splitlines():
-        if "Requests per second" in line:
-            rps = float(line.split(":")[1].strip().split()[0])
-        elif "Time per request" in line and "mean, across all concurrent requests" not in line:
-            mean_time = float(line.split(":")[1].strip().split()[0])
-        elif "95%" in line:
-            p95_time = float(line.strip().split()[1])
-    
-    if HAS_RICH:
+    if USE_RICH:
         panel = Panel(
             f"[bold]Load Test Results[/bold]\n\n"
             f"Endpoint: {url}\n"
@@ -390,15 +663,13 @@ def run_slo_test(args):
     time.sleep(5)
     
     # Display SLO status
-    affected_slo = None
-    for slo_name, slo_def in SLO_DEFINITIONS.items():
-        if any(endpoint == args.endpoint for endpoint in slo_def["endpoints"]):
-            affected_slo = slo_name
-            break
+    affected_slo = ENDPOINT_TO_SLO.get(args.endpoint)
     
     if affected_slo:
         print_info(f"Checking SLO status for {affected_slo}...")
         args.slo = affected_slo
+        # A cached snapshot would predate the load test
+        args.refresh = True
         display_slo_status(args)
     else:
         print_warning(f"Endpoint {args.endpoint} is not covered by any SLO")
@@ -411,6 +682,8 @@ def create_argparser():
     # SLO status command
     status_parser = subparsers.add_parser("status", help="Show SLO status")
     status_parser.add_argument("--slo", help="Show status for a specific SLO")
+    status_parser.add_argument("--refresh", action="store_true",
+                               help="Query Prometheus even if a recent cached status exists")
     status_parser.set_defaults(func=display_slo_status)
     
     # SLO alerts command
@@ -422,6 +695,9 @@ def create_argparser():
     test_parser.add_argument("--endpoint", help="API endpoint to test (e.g., /health)")
     test_parser.add_argument("--requests", type=int, help="Number of requests to send")
     test_parser.add_argument("--concurrency", type=int, help="Number of concurrent requests")
+    test_parser.add_argument("--rate", type=float,
+                             help="Send requests at a fixed rate (requests/sec) instead of back-to-back, "
+                                  "so slow responses can't hide tail latency")
     test_parser.set_defaults(func=run_slo_test)
     
     return parser
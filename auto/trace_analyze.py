@@ -24,157 +24,223 @@ Options:
 
 import argparse
 import datetime
+import heapq
 import json
 import os
 import re
-import subprocess
 import sys
 import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
+
+import requests
+
+# ijson lets traces be analyzed one at a time as the response arrives instead
+# of decoding the whole (often multi-MB) payload up front
+try:
+    import ijson
+    JSON_DECODE_ERRORS = (ValueError, ijson.JSONError)
+except ImportError:
+    ijson = None
+    JSON_DECODE_ERRORS = (ValueError,)
+
+JAEGER_URL = "http://localhost:16686"
+
+# Seconds to wait for Jaeger before giving up on a query
+JAEGER_TIMEOUT = 30
+
+# Shared so repeated queries reuse the same keep-alive connection
+SESSION = requests.Session()
+
+# Long operations listed per trace in text output
+LONG_OPERATIONS_SHOWN = 5
+
+# Values of an "error" tag that mark a span as failed
+ERROR_TAG_VALUES = (True, "true")
+
+# Below this many spans in total, starting worker processes and pickling traces
+# over to them costs more than analyzing everything in this process
+PARALLEL_MIN_SPANS = 10000
 
 def query_jaeger(args):
-    """Query traces from Jaeger API"""
-    # Build query parameters
-    params = []
-    
-    if args.service:
-        params.append(f"service={args.service}")
-    
-    if args.operation:
-        params.append(f"operation={args.operation}")
-    
-    if args.tags:
-        for tag in args.tags:
-            key, value = tag.split('=', 1)
-            params.append(f"tags=%7B%22{key}%22%3A%22{value}%22%7D")
-    
-    if args.since:
-        # Calculate start time in microseconds
-        lookback = int(time.time() * 1000000) - (args.since * 3600 * 1000000)
-        params.append(f"start={lookback}")
-    
-    params.append(f"limit={args.limit}")
-    
+    """Query traces from Jaeger API, yielding each trace as the response streams in"""
     # If specific trace ID provided, use direct API
     if args.trace_id:
-        url = f"http://localhost:16686/api/traces/{args.trace_id}"
+        url = f"{JAEGER_URL}/api/traces/{args.trace_id}"
+        params = None
     else:
-        url = f"http://localhost:16686/api/traces?{'&'.join(params)}"
+        url = f"{JAEGER_URL}/api/traces"
+        params = {"limit": args.limit}
+        
+        if args.service:
+            params["service"] = args.service
+        
+        if args.operation:
+            params["operation"] = args.operation
+        
+        if args.tags:
+            # Jaeger takes every tag filter as one JSON object
+            params["tags"] = json.dumps(dict(tag.split('=', 1) for tag in args.tags))
+        
+        if args.since:
+            # Calculate start time in microseconds
+            params["start"] = int(time.time() * 1000000) - (args.since * 3600 * 1000000)
     
     try:
-        # Run curl to fetch trace data
-        result = subprocess.run(["curl", "-s", url], capture_output=True, text=True, check=True)
-        return json.loads(result.stdout)
-    except (subprocess.SubprocessError, json.JSONDecodeError) as e:
+        response = SESSION.get(url, params=params, timeout=JAEGER_TIMEOUT, stream=True)
+        # Like the trace listing, a missing trace comes back as JSON with no data,
+        # so the status code isn't checked
+        if ijson is None:
+            yield from response.json().get("data") or []
+        else:
+            response.raw.decode_content = True
+            yield from ijson.items(response.raw, "data.item", use_float=True)
+    except requests.ConnectionError:
+        print(f"Error: Cannot connect to Jaeger. Make sure it's running on {JAEGER_URL}")
+        sys.exit(1)
+    except (requests.RequestException,) + JSON_DECODE_ERRORS as e:
         print(f"Error retrieving traces: {e}")
         sys.exit(1)
 
-def analyze_trace(trace):
-    """Extract key insights from a trace"""
+def parent_span_id(span):
+    """Return (parent span ID, whether the parent waits on the span), or (None, False) for a root span
+    
+    The parent waits on CHILD_OF children but not on FOLLOWS_FROM ones, so only
+    the former can be on its critical path.
+    """
+    references = span.get("references") or ()
+    for ref in references:
+        if ref.get("refType") == "CHILD_OF":
+            return ref.get("spanID"), True
+    if references:
+        return references[0].get("spanID"), False
+    parent_id = span.get("parentSpanID") or None
+    return parent_id, parent_id is not None
+
+def subtree_weights(roots, children):
+    """Map id(span) to its duration plus the heaviest chain of descendants below it"""
+    # Iterative DFS gives parents before children; walking that order backwards
+    # settles every child before its parent, so each span is visited once
+    order = []
+    seen = set()
+    stack = list(roots)
+    while stack:
+        span = stack.pop()
+        if id(span) in seen:
+            continue
+        seen.add(id(span))
+        order.append(span)
+        stack.extend(children.get(span.get("spanID"), ()))
+    
+    weights = {}
+    for span in reversed(order):
+        heaviest_child = max(
+            (weights.get(id(child), 0) for child in children.get(span.get("spanID"), ())),
+            default=0
+        )
+        weights[id(span)] = span.get("duration", 0) + heaviest_child
+    return weights
+
+def analyze_trace(trace, max_long_operations=None):
+    """Extract key insights from a trace
+    
+    Only the `max_long_operations` longest operations are kept when given,
+    otherwise all of them.
+    """
     spans = trace.get("spans", [])
     processes = trace.get("processes", {})
     
+    # Resolve each process's service name once instead of per span
+    service_names = {pid: process.get("serviceName", "unknown") for pid, process in processes.items()}
+    
     # Basic metrics
     trace_id = trace.get("traceID", "Unknown")
     span_count = len(spans)
     
-    # Duration analysis
-    durations = [span.get("duration", 0) for span in spans]
-    total_duration = max(durations) if durations else 0  # Microseconds
-    
-    # Service stats
-    service_spans = defaultdict(list)
+    # Every per-span figure comes from this one pass over the spans
+    total_duration = 0  # Microseconds
+    service_durations = defaultdict(int)
+    errors = []
+    threshold_ms = 100  # Consider spans over 100ms as "long"
+    long_operations = []
+    # Call tree for the critical path
+    span_ids = set()
+    parent_ids = []
+    children = defaultdict(list)
     for span in spans:
+        duration = span.get("duration", 0)
+        if duration > total_duration:
+            total_duration = duration
+        
+        span_ids.add(span.get("spanID"))
+        parent_id, blocks_parent = parent_span_id(span)
+        parent_ids.append(parent_id)
+        if blocks_parent:
+            children[parent_id].append(span)
+        
         process_id = span.get("processID")
-        if process_id and process_id in processes:
-            service_name = processes[process_id].get("serviceName", "unknown")
-            service_spans[service_name].append(span)
-    
-    service_count = len(service_spans)
-    
-    # Calculate service time contributions
-    service_durations = {}
-    for service, svc_spans in service_spans.items():
-        # This is a simplification - in reality spans can overlap
-        service_durations[service] = sum(span.get("duration", 0) for span in svc_spans)
-    
-    # Find critical path
-    # This is a simplified approach - proper critical path analysis is more complex
-    critical_path = []
-    if spans:
-        # Sort spans by start time
-        sorted_spans = sorted(spans, key=lambda s: s.get("startTime", 0))
+        service = service_names.get(process_id, "unknown")
+        if process_id in service_names:
+            # This is a simplification - in reality spans can overlap
+            service_durations[service] += duration
         
-        # Simple greedy algorithm - not accurate for complex traces
-        current_end = 0
-        for span in sorted_spans:
-            start = span.get("startTime", 0)
-            end = start + span.get("duration", 0)
-            
-            if start >= current_end:
-                # Get operation name and service
-                operation = span.get("operationName", "unknown")
-                process_id = span.get("processID")
-                service = "unknown"
-                if process_id and process_id in processes:
-                    service = processes[process_id].get("serviceName", "unknown")
-                
-                critical_path.append({
-                    "service": service,
-                    "operation": operation,
-                    "duration": span.get("duration", 0),
-                    "start": start,
-                    "end": end
-                })
-                current_end = end
-    
-    # Find errors
-    errors = []
-    for span in spans:
-        has_error = False
-        for tag in span.get("tags", []):
-            if tag.get("key") == "error" and tag.get("value") == "true":
-                has_error = True
-                break
+        # Jaeger sends bool tags as JSON booleans, older clients as the string "true"
+        has_error = any(
+            tag.get("key") == "error" and tag.get("value") in ERROR_TAG_VALUES
+            for tag in span.get("tags") or ()
+        )
         
         if has_error:
-            process_id = span.get("processID")
-            service = "unknown"
-            if process_id and process_id in processes:
-                service = processes[process_id].get("serviceName", "unknown")
-            
             errors.append({
                 "service": service,
                 "operation": span.get("operationName", "unknown"),
-                "duration": span.get("duration", 0),
+                "duration": duration,
                 "logs": span.get("logs", [])
             })
-    
-    # Identify long operations
-    threshold_ms = 100  # Consider spans over 100ms as "long"
-    long_operations = []
-    for span in spans:
-        duration_ms = span.get("duration", 0) / 1000
+        
+        duration_ms = duration / 1000
         if duration_ms > threshold_ms:
-            process_id = span.get("processID")
-            service = "unknown"
-            if process_id and process_id in processes:
-                service = processes[process_id].get("serviceName", "unknown")
-            
             long_operations.append({
                 "service": service,
                 "operation": span.get("operationName", "unknown"),
                 "duration_ms": duration_ms
             })
     
-    # Sort long operations by duration
-    long_operations.sort(key=lambda x: x["duration_ms"], reverse=True)
+    service_count = len(service_durations)
+    
+    # Find critical path: start at the heaviest root and keep descending into
+    # the child whose subtree accounts for the most span time
+    critical_path = []
+    roots = [span for span, parent_id in zip(spans, parent_ids) if parent_id not in span_ids]
+    weights = subtree_weights(roots, children)
+    span = max(roots, key=lambda s: weights[id(s)], default=None)
+    visited = set()
+    while span is not None and id(span) not in visited:
+        visited.add(id(span))
+        start = span.get("startTime", 0)
+        duration = span.get("duration", 0)
+        critical_path.append({
+            "service": service_names.get(span.get("processID"), "unknown"),
+            "operation": span.get("operationName", "unknown"),
+            "duration": duration,
+            "start": start,
+            "end": start + duration
+        })
+        span = max(children.get(span.get("spanID"), ()), key=lambda s: weights.get(id(s), 0), default=None)
+    
+    # Sort long operations by duration, only ranking as many as will be shown
+    if max_long_operations is None:
+        long_operations.sort(key=lambda x: x["duration_ms"], reverse=True)
+    else:
+        long_operations = heapq.nlargest(max_long_operations, long_operations, key=lambda x: x["duration_ms"])
     
     return {
         "trace_id": trace_id,
         "span_count": span_count,
         "total_duration_ms": total_duration / 1000,  # Convert to milliseconds
-        "services": list(service_spans.keys()),
+        "services": list(service_durations.keys()),
         "service_count": service_count,
         "service_durations": {svc: dur / 1000 for svc, dur in service_durations.items()},  # ms
         "errors": errors,
@@ -182,6 +248,36 @@ def analyze_trace(trace):
         "long_operations": long_operations
     }
 
+def usable_cpu_count():
+    """CPUs this process may run on, honouring affinity limits where the OS reports them"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def analyze_traces(traces, max_long_operations=None):
+    """Analyze every trace, in order, spreading large batches across CPU cores"""
+    analyze = partial(analyze_trace, max_long_operations=max_long_operations)
+    
+    # With a single usable core the pool only adds process startup and pickling
+    workers = usable_cpu_count()
+    if workers <= 1:
+        return [analyze(trace) for trace in traces]
+    
+    # Hold traces back only until we know whether the batch is big enough to parallelize
+    buffered = []
+    span_total = 0
+    for trace in traces:
+        buffered.append(trace)
+        span_total += len(trace.get("spans", []))
+        if span_total >= PARALLEL_MIN_SPANS:
+            break
+    else:
+        return [analyze(trace) for trace in buffered]
+    
+    # Each trace is independent, so the rest of the stream can go straight to the workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(analyze, chain(buffered, traces), chunksize=4))
+
 def print_trace_summary(analysis, verbose=False):
     """Print a summary of the trace analysis"""
     print(f"Trace ID: {analysis['trace_id']}")
@@ -204,7 +300,7 @@ def print_trace_summary(analysis, verbose=False):
                     print(f"    {log.get('timestamp', 'unknown')}: {log.get('fields', [])}")
     
     print("\nLong Operations (>100ms):")
-    for op in analysis['long_operations'][:5]:  # Show top 5 by default
+    for op in analysis['long_operations'][:LONG_OPERATIONS_SHOWN]:
         print(f"  {op['service']} - {op['operation']}: {op['duration_ms']:.2f} ms")
     
     if verbose:
@@ -213,7 +309,7 @@ def print_trace_summary(analysis, verbose=False):
             print(f"  {i+1}. {span['service']} - {span['operation']}: {span['duration'] / 1000:.2f} ms")
     
     # Add URL to view in Jaeger
-    print(f"\nView in Jaeger: http://localhost:16686/trace/{analysis['trace_id']}")
+    print(f"\nView in Jaeger: {JAEGER_URL}/trace/{analysis['trace_id']}")
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze traces from Jaeger")
@@ -232,25 +328,20 @@ def main():
     
     args = parser.parse_args()
     
-    # Check if Jaeger is running
-    try:
-        subprocess.run(["curl", "-s", "http://localhost:16686/api/services"], 
-                      capture_output=True, check=True)
-    except subprocess.SubprocessError:
-        print("Error: Cannot connect to Jaeger. Make sure it's running on http://localhost:16686")
-        sys.exit(1)
+    # Text output only lists the top few long operations; JSON keeps them all
+    max_long_operations = None if args.format == "json" else LONG_OPERATIONS_SHOWN
     
-    # Get traces from Jaeger
-    traces_data = query_jaeger(args)
+    # Get traces from Jaeger; this also reports when Jaeger isn't reachable
+    traces = query_jaeger(args)
     
     if args.trace_id:
         # Single trace mode
-        if not traces_data or not traces_data.get("data"):
+        trace = next(traces, None)
+        if trace is None:
             print(f"No trace found with ID: {args.trace_id}")
             sys.exit(1)
         
-        trace = traces_data["data"][0]
-        analysis = analyze_trace(trace)
+        analysis = analyze_trace(trace, max_long_operations)
         
         if args.format == "json":
             if args.output:
@@ -262,16 +353,14 @@ def main():
             print_trace_summary(analysis, args.verbose)
     
     else:
-        # Multiple traces mode
-        if not traces_data or not traces_data.get("data"):
+        # Multiple traces mode: analyze each trace as it arrives so only its
+        # analysis, not the raw spans, is kept
+        analyses = analyze_traces(traces, max_long_operations)
+        
+        if not analyses:
             print("No traces found matching the criteria.")
             sys.exit(0)
         
-        traces = traces_data["data"]
-        
-        # Analyze all traces
-        analyses = [analyze_trace(trace) for trace in traces]
-        
         # Sort the analyses
         if args.sort == "duration":
             analyses.sort(key=lambda a: a["total_duration_ms"], reverse=True)
@@ -1,26 +1,87 @@
 #!/usr/bin/env python3
 # generate_secrets.py
-import secrets
-import argparse
+import os
+import sys
+from hashlib import shake_256
 
-def generate_secret(length=32):
-    return secrets.token_hex(length)
+USAGE = """usage: generate_secrets.py [-h] [--jwt] [--db] [--redis] [--all] [--length LENGTH]
+
+Generate secure secrets for production
+
+options:
+  -h, --help       show this help message and exit
+  --jwt            Generate JWT secret
+  --db             Generate DB password
+  --redis          Generate Redis password
+  --all            Generate all secrets
+  --length LENGTH  Secret length (default: 32)"""
+
+FLAGS = {"--jwt", "--db", "--redis", "--all"}
+
+class EntropyPool:
+    """SHAKE-256 sponge seeded once from the OS CSPRNG, so batch generation
+    doesn't go back to the kernel for every secret"""
+
+    RATCHET_BYTES = 32
+
+    def __init__(self, seed_length=64):
+        self._sponge = shake_256(os.urandom(seed_length))
+
+    def draw(self, length):
+        # Squeeze the output plus a fresh key, then rekey from that key so earlier
+        # draws can't be recovered from the pool state
+        out = self._sponge.digest(length + self.RATCHET_BYTES)
+        self._sponge = shake_256(out[length:])
+        return out[:length]
+
+def usage_error(message):
+    print(f"{USAGE.splitlines()[0]}\ngenerate_secrets.py: error: {message}", file=sys.stderr)
+    sys.exit(2)
+
+def parse_args(argv):
+    """Parse the handful of flags this script takes without pulling in argparse"""
+    flags = set()
+    length = 32
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-h", "--help"):
+            print(USAGE)
+            sys.exit(0)
+        elif arg in FLAGS:
+            flags.add(arg)
+        elif arg == "--length" or arg.startswith("--length="):
+            if arg == "--length":
+                i += 1
+                value = argv[i] if i < len(argv) else None
+            else:
+                value = arg.split("=", 1)[1]
+            try:
+                length = int(value)
+            except (TypeError, ValueError):
+                usage_error("argument --length: expected an integer")
+            if length <= 0:
+                usage_error(f"argument --length: must be a positive integer, got {length}")
+        else:
+            usage_error(f"unrecognized arguments: {arg}")
+        i += 1
+    return flags, length
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Generate secure secrets for production")
-    parser.add_argument("--jwt", action="store_true", help="Generate JWT secret")
-    parser.add_argument("--db", action="store_true", help="Generate DB password")
-    parser.add_argument("--redis", action="store_true", help="Generate Redis password")
-    parser.add_argument("--all", action="store_true", help="Generate all secrets")
-    parser.add_argument("--length", type=int, default=32, help="Secret length (default: 32)")
-    
-    args = parser.parse_args()
+    flags, length = parse_args(sys.argv[1:])
+    generate_all = "--all" in flags
     
-    if args.all or args.jwt:
-        print(f"JWT_SECRET_KEY={generate_secret(args.length)}")
-    
-    if args.all or args.db:
-        print(f"DB_PASSWORD={generate_secret(16)}")
-    
-    if args.all or args.redis:
-        print(f"REDIS_PASSWORD={generate_secret(16)}")
\ No newline at end of file
+    # Draw entropy for every requested secret from the pool at once, then slice
+    requested = []
+    if generate_all or "--jwt" in flags:
+        requested.append(("JWT_SECRET_KEY", length))
+    if generate_all or "--db" in flags:
+        requested.append(("DB_PASSWORD", 16))
+    if generate_all or "--redis" in flags:
+        requested.append(("REDIS_PASSWORD", 16))
+
+    buf = EntropyPool().draw(sum(size for _, size in requested))
+    offset = 0
+    for name, size in requested:
+        print(f"{name}={buf[offset:offset + size].hex()}")
+        offset += size
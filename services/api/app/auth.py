@@ -1,8 +1,13 @@
+import hmac
+import threading
+import time
 from datetime import datetime, timedelta
 from typing import Optional
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from . import models, database
 from app.security.credentials import CredentialManager
@@ -17,33 +22,105 @@ ACCESS_TOKEN_EXPIRE_MINUTES = jwt_settings["access_token_expire_minutes"]
 # Token URL is where the client will send username/password to get a token
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# In-process cache of username -> user id so repeated logins resolve the user by
+# primary key. Only the id is cached: the password hash and is_active are always
+# read from the database, so writes made by other workers are seen immediately
+_user_cache = TTLCache(maxsize=1024, ttl=600)
+_user_cache_lock = threading.Lock()
+
+# Verified bearer tokens -> (username, exp) so repeat requests skip the JWT
+# signature check; kept short so the cache never outlives much of a token
+_token_cache = TTLCache(maxsize=10_000, ttl=30)
+_token_cache_lock = threading.Lock()
+
+# Verified against when the username doesn't exist so unknown users cost the same
+# bcrypt work as known ones and can't be told apart by response time
+_DUMMY_HASH = models.User.get_password_hash("not-a-real-password")
+
+# Every bcrypt variant ($2a$, $2b$, $2y$) starts with this
+_BCRYPT_PREFIX = "$2"
+
+# Suffix marking legacy sample passwords stored in plaintext
+_LEGACY_SUFFIX = "_hashed"
+_LEGACY_SUFFIX_LEN = len(_LEGACY_SUFFIX)
+
+
+def _get_user(db: Session, username: str):
+    """Fetch a user for login, resolving the username through the in-process id cache"""
+    key = username.lower()
+    with _user_cache_lock:
+        user_id = _user_cache.get(key)
+    if user_id is not None:
+        user = db.get(models.User, user_id)
+        # The id is only a hint: the user may since have been renamed or deleted
+        if user is not None and user.username_lower == key:
+            return user
+        invalidate_cached_user(key)
+
+    user = db.query(models.User).filter(models.User.username_lower == key).first()
+    if user:
+        with _user_cache_lock:
+            _user_cache[key] = user.id
+    return user
+
+
+def invalidate_cached_user(username: str):
+    """Drop a username from the login cache once its update or delete has committed"""
+    with _user_cache_lock:
+        _user_cache.pop(username.lower(), None)
+
+
+def _upgrade_password_hash(user_id: int, username: str, password: str, legacy_hash: str):
+    """Replace a legacy sample password with a bcrypt hash in its own session"""
+    new_hash = models.User.get_password_hash(password)
+    db = database.SessionLocal()
+    try:
+        # Single UPDATE instead of SELECT + UPDATE; matching on the legacy value
+        # also makes concurrent upgrades from other workers a no-op
+        db.execute(
+            update(models.User)
+            .where(models.User.id == user_id, models.User.hashed_password == legacy_hash)
+            .values(hashed_password=new_hash)
+        )
+        db.commit()
+    finally:
+        db.close()
+    invalidate_cached_user(username)
+
 
 def authenticate_user(db: Session, username: str, password: str):
     """Verify username and password"""
-    user = db.query(models.User).filter(models.User.username == username).first()
+    user = _get_user(db, username)
     if not user:
+        models.User.verify_password(password, _DUMMY_HASH)
         return False
     
-    # First try: Standard bcrypt verification
-    try:
+    # Sample data is seeded with bcrypt hashes, so this is the only check
+    # needed for fresh databases
+    if user.hashed_password.startswith(_BCRYPT_PREFIX):
         if models.User.verify_password(password, user.hashed_password):
             return user
-    except Exception as e:
-        # If error occurs with password hash, try direct comparison for sample data
-        # Check if this is one of the sample passwords (ends with '_hashed')
-        if user.hashed_password.endswith('_hashed'):
-            plain_password = user.hashed_password.replace('_hashed', '')
-            if password == plain_password:
-                # Update with proper hash for future logins
-                user.hashed_password = models.User.get_password_hash(password)
-                db.commit()
-                return user
-        # Special case for admin
-        elif user.username == 'admin' and password == 'admin123':
-            # Update admin with proper hash
-            user.hashed_password = models.User.get_password_hash(password)
-            db.commit()
-            return user
+        return False
+
+    # Databases seeded before bcrypt fixtures still hold legacy sample values -
+    # pick the expected plaintext up front so both legacy cases share a single
+    # constant-time comparison: sample passwords end with '_hashed', admin
+    # falls back to its default password
+    if user.hashed_password[-_LEGACY_SUFFIX_LEN:] == _LEGACY_SUFFIX:
+        candidate = user.hashed_password[:-_LEGACY_SUFFIX_LEN]
+    elif user.username == 'admin':
+        candidate = 'admin123'
+    else:
+        candidate = ''
+    matched = hmac.compare_digest(password.encode(), candidate.encode())
+    if matched and candidate:
+        # Upgrade to a proper hash for future logins without holding up this one
+        threading.Thread(
+            target=_upgrade_password_hash,
+            args=(user.id, username, password, user.hashed_password),
+            daemon=True,
+        ).start()
+        return user
     
     return False
 
@@ -63,18 +140,31 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Decode the JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+    if cached is not None and cached[1] > time.time():
+        username = cached[0]
+    else:
+        try:
+            # Decode the JWT token
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            username: str = payload.get("sub")
+            if username is None:
+                raise credentials_exception
+        except JWTError:
             raise credentials_exception
-    except JWTError:
-        raise credentials_exception
         
-    # Get the user from the database
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if user is None:
+        # decode() has already rejected expired tokens; ones without an exp
+        # claim aren't cached so they keep being fully verified
+        exp = payload.get("exp")
+        if exp is not None:
+            with _token_cache_lock:
+                _token_cache[token] = (username, exp)
+        
+    # Always read the user from the database rather than the login cache, so a
+    # cached token stops working as soon as its user is deleted or deactivated
+    user = db.query(models.User).filter(models.User.username_lower == username.lower()).first()
+    if user is None or user.is_active is False:
         raise credentials_exception
         
     return user
\ No newline at end of file
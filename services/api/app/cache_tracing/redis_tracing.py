@@ -2,6 +2,7 @@
 Enhanced Redis tracing for OpenTelemetry
 """
 import functools
+import threading
 import time
 import logging
 import json
@@ -24,19 +25,78 @@ try:
 except ImportError:
     TRACING_AVAILABLE = False
 
-logger = logging.getLogger(__name__)
+# Resolved once; a proxy tracer follows the provider configured at startup
+_TRACER = trace.get_tracer(__name__) if TRACING_AVAILABLE else None
+
+# Keys longer than this are truncated in span attributes
+MAX_KEY_DISPLAY_LENGTH = 128
 
-# Cache operation statistics
-cache_stats = {
-    "hits": 0,
-    "misses": 0,
-    "sets": 0,
-    "deletes": 0,
-    "errors": 0,
-    "total_time_ms": 0,
-    "operations": 0
+# Value of db.redis.operation_type for the cache operations we classify
+OPERATION_TYPES = {
+    "get": "read",
+    "mget": "read",
+    "set": "write",
+    "setex": "write",
+    "delete": "delete"
 }
 
+@functools.lru_cache(maxsize=None)
+def _span_name(operation):
+    """Span name for a Redis operation, built once per command"""
+    return f"redis.{operation}"
+
+logger = logging.getLogger(__name__)
+
+# Cache operation statistics, kept as one shard per thread so the hot path
+# never contends or loses increments; shards are summed on read
+CACHE_STAT_KEYS = ("hits", "misses", "sets", "deletes", "errors", "total_time_ns", "operations")
+_stats_local = threading.local()
+_stats_shards = []
+_stats_shards_lock = threading.Lock()
+
+def _thread_cache_stats():
+    """Return the calling thread's statistics shard, registering it on first use"""
+    try:
+        return _stats_local.stats
+    except AttributeError:
+        stats = dict.fromkeys(CACHE_STAT_KEYS, 0)
+        with _stats_shards_lock:
+            _stats_shards.append(stats)
+        _stats_local.stats = stats
+        return stats
+
+def _collect_cache_stats():
+    """Sum the statistics shards of every thread"""
+    totals = dict.fromkeys(CACHE_STAT_KEYS, 0)
+    with _stats_shards_lock:
+        shards = list(_stats_shards)
+    for stats in shards:
+        for key in CACHE_STAT_KEYS:
+            totals[key] += stats[key]
+    return totals
+
+def _count_result(cache_stats, operation, result):
+    """Update the statistics shard for a completed Redis operation"""
+    if operation == 'get':
+        if result is None:
+            cache_stats["misses"] += 1
+        else:
+            cache_stats["hits"] += 1
+    elif operation == 'mget':
+        misses = result.count(None)
+        cache_stats["misses"] += misses
+        cache_stats["hits"] += len(result) - misses
+    elif operation in ['set', 'setex']:
+        cache_stats["sets"] += 1
+    elif operation == 'delete':
+        cache_stats["deletes"] += 1
+
+def _is_recording():
+    """Whether the current trace is sampled, so a Redis span would be exported"""
+    if not TRACING_AVAILABLE:
+        return False
+    return trace.get_current_span().get_span_context().trace_flags.sampled
+
 def instrument_redis(client=None):
     """
     Wrap an existing Redis client with tracing or return a new traced client
@@ -81,7 +141,7 @@ class TracedRedis:
             raise ImportError("Redis package not available")
         
         self._redis = redis.Redis(host=host, port=port, db=db, password=password, **kwargs)
-        self._connection_info = f"redis://{host}:{port}/{db}"
+        self._set_connection_info(f"redis://{host}:{port}/{db}")
     
     @classmethod
     def from_client(cls, client):
@@ -97,7 +157,7 @@ class TracedRedis:
         traced = cls()
         traced._redis = client
         connection_params = client.connection_pool.connection_kwargs
-        traced._connection_info = (
+        traced._set_connection_info(
             f"redis://{connection_params.get('host', 'localhost')}:"
             f"{connection_params.get('port', 6379)}/"
             f"{connection_params.get('db', 0)}"
@@ -118,9 +178,17 @@ class TracedRedis:
         """
         client = redis.Redis.from_url(url, **kwargs)
         traced = cls.from_client(client)
-        traced._connection_info = url
+        traced._set_connection_info(url)
         return traced
     
+    def _set_connection_info(self, connection_info):
+        """Record the connection string and the span attributes shared by every operation"""
+        self._connection_info = connection_info
+        self._base_attrs = {
+            "db.system": "redis",
+            "db.redis.connection": connection_info
+        }
+    
     def _trace_operation(self, operation, key=None, args=None, value_hint=None):
         """
         Internal method to trace a Redis operation
@@ -141,21 +209,17 @@ class TracedRedis:
                 yield None
             return dummy_context()
         
-        tracer = trace.get_tracer(__name__)
-        
         # Prepare span attributes
-        span_attributes = {
-            "db.system": "redis",
-            "db.operation": operation,
-            "db.redis.connection": self._connection_info
-        }
+        span_attributes = self._base_attrs | {"db.operation": operation}
         
         if key is not None:
             # Truncate long keys to avoid span attribute size limits
-            if isinstance(key, str) and len(key) > 128:
-                key_display = key[:128] + "..."
-            else:
+            if not isinstance(key, str):
                 key_display = str(key)
+            elif len(key) > MAX_KEY_DISPLAY_LENGTH:
+                key_display = key[:MAX_KEY_DISPLAY_LENGTH] + "..."
+            else:
+                key_display = key
                 
             span_attributes["db.redis.key"] = key_display
         
@@ -166,208 +230,185 @@ class TracedRedis:
             span_attributes["db.redis.value_hint"] = value_hint
             
         # Create and return the span context
-        return tracer.start_as_current_span(
-            f"redis.{operation}",
+        return _TRACER.start_as_current_span(
+            _span_name(operation),
             attributes=span_attributes
         )
-    @classmethod     
-    def _traced_operation(cls, operation):
+    def _traced_operation(self, operation, func):
         """
-        Create a decorator to trace a Redis operation
+        Wrap a bound Redis method so each call is traced
         
         Args:
             operation: Name of the Redis operation
+            func: The underlying client's bound method
             
         Returns:
-            A decorator function
+            The traced method
         """
-        def decorator(func):
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                start_time = time.time()
-                
-                # The first argument after self is usually the key
-                key = args[1] if len(args) > 1 else None
-                
-                # For multi-key operations, handle differently
-                if operation in ['mget', 'mset'] and isinstance(key, (list, tuple)):
-                    # For multi-key operations, join keys for display
-                    keys_display = ', '.join(str(k) for k in key[:5])
-                    if len(key) > 5:
-                        keys_display += f"... ({len(key)} total)"
-                    key = keys_display
-                
-                span_args = {}
-                
-                # Add specialized attributes based on the operation
-                if operation == 'get':
-                    span_args["db.redis.operation_type"] = "read"
-                elif operation in ['set', 'setex']:
-                    span_args["db.redis.operation_type"] = "write"
-                    # Add TTL information if available
-                    if operation == 'setex' and len(args) > 2:
-                        span_args["db.redis.ttl"] = args[2]
-                elif operation == 'delete':
-                    span_args["db.redis.operation_type"] = "delete"
-                
-                # Track this operation in stats
-                cache_stats["operations"] += 1
-                
-                # Start the span
-                with self._trace_operation(operation, key, span_args) as span:
-                    try:
-                        # Execute the original Redis operation
-                        result = func(*args, **kwargs)
+        operation_type = OPERATION_TYPES.get(operation)
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start_ns = time.perf_counter_ns()
+            cache_stats = _thread_cache_stats()
+            
+            # Track this operation in stats
+            cache_stats["operations"] += 1
+            
+            # Fast path: nothing is recording this request, so skip building
+            # a span and only keep the stats up to date
+            if not _is_recording():
+                try:
+                    result = func(*args, **kwargs)
+                except RedisError:
+                    cache_stats["errors"] += 1
+                    raise
+                finally:
+                    cache_stats["total_time_ns"] += time.perf_counter_ns() - start_ns
+                _count_result(cache_stats, operation, result)
+                return result
+            
+            # The first argument is usually the key
+            key = args[0] if args else None
+            
+            span_args = {}
+            
+            # For multi-key operations, handle differently
+            if operation in ['mget', 'mset'] and isinstance(key, (list, tuple)):
+                span_args["db.redis.batch_size"] = len(key)
+                # For multi-key operations, join keys for display
+                keys_display = ', '.join(str(k) for k in key[:5])
+                if len(key) > 5:
+                    keys_display += f"... ({len(key)} total)"
+                key = keys_display
+            
+
+            # Add specialized attributes based on the operation
+            if operation_type is not None:
+                span_args["db.redis.operation_type"] = operation_type
+                # Add TTL information if available
+                if operation == 'setex' and len(args) > 1:
+                    span_args["db.redis.ttl"] = args[1]
+            
+            # Start the span
+            with self._trace_operation(operation, key, span_args) as span:
+                try:
+                    # Execute the original Redis operation
+                    result = func(*args, **kwargs)
+                    
+                    # Update cache stats based on the operation
+                    _count_result(cache_stats, operation, result)
+                    
+                    # Record success and result info in the span
+                    if span and hasattr(span, 'set_attribute'):
+                        if operation == 'get' and result is not None:
+                            # For get operations with a result, add result type and length
+                            try:
+                                span.set_attribute("db.redis.result_type", type(result).__name__)
+                                if isinstance(result, bytes):
+                                    span.set_attribute("db.redis.result_length_bytes", len(result))
+                            except Exception:
+                                pass
                         
-                        # Update cache stats based on the operation
+                        # Add cache hit/miss attribute for get operations
                         if operation == 'get':
-                            if result is None:
-                                cache_stats["misses"] += 1
-                                span_args["db.redis.hit"] = False
-                            else:
-                                cache_stats["hits"] += 1
-                                span_args["db.redis.hit"] = True
-                        elif operation in ['set', 'setex']:
-                            cache_stats["sets"] += 1
-                        elif operation == 'delete':
-                            cache_stats["deletes"] += 1
-                        
-                        # Record success and result info in the span
-                        if span and hasattr(span, 'set_attribute'):
-                            if operation == 'get' and result is not None:
-                                # For get operations with a result, add result type and length
-                                try:
-                                    span.set_attribute("db.redis.result_type", type(result).__name__)
-                                    if isinstance(result, bytes):
-                                        span.set_attribute("db.redis.result_length_bytes", len(result))
-                                except Exception:
-                                    pass
-                            
-                            # Add cache hit/miss attribute for get operations
-                            if operation == 'get':
-                                span.set_attribute("db.redis.hit", result is not None)
-                        
-                        return result
-                        
-                    except RedisError as e:
-                        # Record the error
-                        cache_stats["errors"] += 1
-                        
-                        if span and hasattr(span, 'set_status'):
-                            span.set_status(Status(StatusCode.ERROR))
-                            span.record_exception(e)
-                            span.set_attribute("error.type", e.__class__.__name__)
-                            span.set_attribute("error.message", str(e))
-                        
-                        # Re-raise the exception
-                        raise
-                    finally:
-                        # Record timing information
-                        duration_ms = (time.time() - start_time) * 1000
-                        cache_stats["total_time_ms"] += duration_ms
-                        
-                        if span and hasattr(span, 'set_attribute'):
-                            span.set_attribute("db.execution_time_ms", duration_ms)
-            
-            return wrapper
+                            span.set_attribute("db.redis.hit", result is not None)
+                    
+                    return result
+                    
+                except RedisError as e:
+                    # Record the error
+                    cache_stats["errors"] += 1
+                    
+                    if span and hasattr(span, 'set_status'):
+                        span.set_status(Status(StatusCode.ERROR))
+                        span.record_exception(e)
+                        span.set_attribute("error.type", e.__class__.__name__)
+                        span.set_attribute("error.message", str(e))
+                    
+                    # Re-raise the exception
+                    raise
+                finally:
+                    # Record timing information
+                    duration_ns = time.perf_counter_ns() - start_ns
+                    cache_stats["total_time_ns"] += duration_ns
+                    
+                    if span and hasattr(span, 'set_attribute'):
+                        span.set_attribute("db.execution_time_ms", duration_ns / 1e6)
         
-        return decorator
+        return wrapper
     
     def __getattr__(self, name):
         """
         Proxy attribute access to the underlying Redis client, adding tracing
         
         This allows us to transparently add tracing to any Redis operation.
+        Traced methods are stored on the instance, so each one is only wrapped
+        on first use and later calls skip this lookup entirely.
         """
+        # Only reached for attributes not set yet, e.g. while unpickling
+        if name == '_redis':
+            raise AttributeError(name)
+        
         redis_attr = getattr(self._redis, name)
         
         # If this is a callable (method), add tracing
         if callable(redis_attr):
-            return self._traced_operation(name)(redis_attr)
+            traced = self._traced_operation(name, redis_attr)
+            object.__setattr__(self, name, traced)
+            return traced
         
         # Otherwise just return the attribute
         return redis_attr
     
-    # Explicitly implement core Redis methods for better IDE support
+    def mget_batched(self, keys, max_batch=100):
+        """
+        Get many keys in a single round trip, traced as one redis.mget span
+        
+        Keys are split into MGET commands of at most max_batch keys, all
+        queued on one pipeline, so large lookups neither block Redis on a
+        single huge command nor pay a round trip per key.
+        
+        Args:
+            keys: The Redis keys to fetch
+            max_batch: Maximum number of keys per MGET command
+            
+        Returns:
+            List of values in key order, None for missing keys
+            
+        Raises:
+            ValueError: If max_batch is not positive
+        """
+        if max_batch <= 0:
+            raise ValueError(f"max_batch must be a positive number of keys, got {max_batch}")
+        
+        keys = list(keys)
+        if not keys:
+            return []
+        return self._traced_operation('mget', self._mget_pipelined)(keys, max_batch)
+    
+    def _mget_pipelined(self, keys, max_batch):
+        """Run chunked MGET commands for keys on one non-transactional pipeline"""
+        pipe = self._redis.pipeline(transaction=False)
+        for start in range(0, len(keys), max_batch):
+            pipe.mget(keys[start:start + max_batch])
+        return [value for chunk in pipe.execute() for value in chunk]
+    
     @property
     def connection_pool(self):
         return self._redis.connection_pool
-    
-    def get(self, key):
-        return self._redis.get(key)
-    
-    def set(self, key, value, ex=None, px=None, nx=False, xx=False):
-        return self._redis.set(key, value, ex=ex, px=px, nx=nx, xx=xx)
-    
-    def setex(self, key, time, value):
-        return self._redis.setex(key, time, value)
-    
-    def delete(self, *keys):
-        return self._redis.delete(*keys)
-    
-    def exists(self, *keys):
-        return self._redis.exists(*keys)
-    
-    def expire(self, key, time):
-        return self._redis.expire(key, time)
-    
-    def ttl(self, key):
-        return self._redis.ttl(key)
-    
-    def incr(self, key, amount=1):
-        return self._redis.incr(key, amount)
-    
-    def decr(self, key, amount=1):
-        return self._redis.decr(key, amount)
-    
-    def hget(self, key, field):
-        return self._redis.hget(key, field)
-    
-    def hset(self, key, field, value):
-        return self._redis.hset(key, field, value)
-    
-    def hmget(self, key, fields):
-        return self._redis.hmget(key, fields)
-    
-    def hmset(self, key, mapping):
-        return self._redis.hmset(key, mapping)
-    
-    def hgetall(self, key):
-        return self._redis.hgetall(key)
-    
-    def lpush(self, key, *values):
-        return self._redis.lpush(key, *values)
-    
-    def rpush(self, key, *values):
-        return self._redis.rpush(key, *values)
-    
-    def lpop(self, key):
-        return self._redis.lpop(key)
-    
-    def rpop(self, key):
-        return self._redis.rpop(key)
-    
-    def lrange(self, key, start, end):
-        return self._redis.lrange(key, start, end)
-    
-    def ping(self):
-        return self._redis.ping()
-
-    """Get the current cache statistics"""
-    # Calculate average operation time
-    if cache_stats["operations"] > 0:
-        avg_time = cache_stats["total_time_ms"] / cache_stats["operations"]
-    else:
-        avg_time = 0
-        
-    # Return stats with calculated values
 
 def get_cache_stats():
+    """Get the current cache statistics"""
+    cache_stats = _collect_cache_stats()
+    
+    # Calculate average operation time, converting from nanoseconds
     if cache_stats["operations"] > 0:
         avg_time = (cache_stats["total_time_ns"] / 1e6) / cache_stats["operations"]
     else:
         avg_time = 0
     
+    # Return stats with calculated values
     return {
         "hit_ratio": cache_stats["hits"] / (cache_stats["hits"] + cache_stats["misses"]) * 100 if (cache_stats["hits"] + cache_stats["misses"]) > 0 else 0,
         "avg_operation_time_ms": avg_time,
@@ -381,12 +422,7 @@ def get_cache_stats():
 
 def reset_cache_stats():
     """Reset the cache statistics"""
-    for key in cache_stats:
-        cache_stats[key] = 0
-
-# Post-class instrumentation
-for method_name in ['get', 'set', 'setex', 'delete', 'exists', 'expire', 'ttl',
-                   'incr', 'decr', 'hget', 'hset', 'hmget', 'hmset', 'hgetall',
-                   'lpush', 'rpush', 'lpop', 'rpop', 'lrange', 'ping']:
-    method = getattr(TracedRedis, method_name)
-    setattr(TracedRedis, method_name, TracedRedis._traced_operation(method_name)(method))
+    with _stats_shards_lock:
+        for stats in _stats_shards:
+            for key in CACHE_STAT_KEYS:
+                stats[key] = 0
@@ -1,28 +1,40 @@
 # config.py
-import os
+import re
+import socket
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from app.security.credentials import CredentialManager
 
-# Get Redis configuration from environment variables
-# Don't hardcode defaults in the code - rely on .env.dev or docker-compose
-redis_password = os.getenv('REDIS_PASSWORD')
-redis_host = os.getenv('REDIS_HOST', 'redis')  # Only hostname gets a default
-redis_port = os.getenv('REDIS_PORT', '6379')   # Only port gets a default
-
-# First check if there's a complete REDIS_URL provided
-redis_url = os.getenv('REDIS_URL')
-
-# If not, construct it from components, ensuring password is included if present
-if not redis_url:
-    if redis_password:
-        redis_url = f"redis://:{redis_password}@{redis_host}:{redis_port}/0"
-    else:
-        redis_url = f"redis://{redis_host}:{redis_port}/0"
+# Resolve Redis the same way the API's clients do, so the limiter and the
+# clients always agree on REDIS_URL vs host/port vs unix socket precedence
+redis_url = CredentialManager.get_redis_url()
 
 # Log the URL (without exposing the password)
-masked_url = redis_url.replace(f":{redis_password}@", ":***@") if redis_password else redis_url
+masked_url = re.sub(r"://([^:@/]*):[^@/]*@", r"://\1:***@", redis_url)
 print(f"Using Redis URL: {masked_url}")
 
+# Connection settings shared by every Redis client. Idle pooled connections
+# are probed with TCP keepalive and checked before reuse, so a connection
+# dropped by the network fails fast instead of stalling the next request.
+# redis-py already sets TCP_NODELAY on its TCP sockets.
+redis_client_kwargs = {
+    "socket_connect_timeout": 5,
+    "socket_timeout": 2,
+    "retry_on_timeout": True,
+    "health_check_interval": 30,
+    "max_connections": 100
+}
+
+# Keepalive only applies to TCP; unix socket connections reject these options
+if not redis_url.startswith("unix://"):
+    redis_client_kwargs["socket_keepalive"] = True
+    # Not every platform exposes all keepalive tunables
+    redis_client_kwargs["socket_keepalive_options"] = {
+        getattr(socket, option): value
+        for option, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+        if hasattr(socket, option)
+    }
+
 # Initialize Limiter
 limiter = Limiter(
     key_func=get_remote_address,
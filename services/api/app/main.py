@@ -6,7 +6,7 @@ from fastapi import status
 from slowapi import _rate_limit_exceeded_handler  
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
-from .config import limiter
+from .config import limiter, redis_client_kwargs
 from app.middleware.trace_context import setup_trace_context_middleware
 from app.middleware.tracing_middleware import setup_tracing_metrics_middleware
 import redis
@@ -126,13 +126,7 @@ def get_redis_client():
     for attempt in range(max_retries):
         try:
             # Connect using the secure URL
-            redis_client = redis.Redis.from_url(
-                redis_url,
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-                retry_on_timeout=True,
-                max_connections=100
-            )
+            redis_client = redis.Redis.from_url(redis_url, **redis_client_kwargs)
             redis_client.ping()  # Test the connection
             return redis_client
         except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
@@ -326,13 +320,7 @@ def get_redis_client():
     for attempt in range(max_retries):
         try:
             # Create the standard Redis client first
-            base_client = redis.Redis.from_url(
-                redis_url,
-                socket_connect_timeout=5,
-                socket_keepalive=True,
-                retry_on_timeout=True,
-                max_connections=100
-            )
+            base_client = redis.Redis.from_url(redis_url, **redis_client_kwargs)
             
             # Test the connection
             base_client.ping()
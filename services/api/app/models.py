@@ -1,11 +1,40 @@
 from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from passlib.context import CryptContext
+import bcrypt
+import os
+import time
 
 from .database import Base
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Slowest verify we accept on the login path when picking the bcrypt cost
+BCRYPT_TARGET_SECONDS = float(os.getenv("BCRYPT_TARGET_SECONDS", "0.25"))
+# Floor for the calibrated cost: passlib's previous default, which the seeded
+# sample hashes and the login timing dummy also use, so calibration only raises it
+BCRYPT_MIN_ROUNDS = 12
+
+
+def _calibrate_bcrypt_rounds(target: float = BCRYPT_TARGET_SECONDS) -> int:
+    """Pick the highest bcrypt cost whose hash time stays under the target on this CPU"""
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(BCRYPT_MIN_ROUNDS))
+    elapsed = time.perf_counter() - start
+
+    # Each extra round doubles the work, so extrapolate from the single measurement
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < 31 and elapsed * 2 <= target:
+        rounds += 1
+        elapsed *= 2
+    return rounds
+
+
+# BCRYPT_ROUNDS pins the cost explicitly; otherwise it is tuned once at startup
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS") or _calibrate_bcrypt_rounds())
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+# passlib resolves the bcrypt backend lazily; do it at import instead of on the first login
+pwd_context.handler("bcrypt").get_backend()
 
 class User(Base):
     __tablename__ = "users"
@@ -13,11 +42,19 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True)
     username = Column(String, unique=True, index=True)
+    # Lowercased copy of username so case-insensitive lookups can use an index
+    username_lower = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    @validates("username")
+    def _sync_username_lower(self, key, username):
+        """Keep username_lower in step with username on insert and update"""
+        self.username_lower = username.lower() if username is not None else None
+        return username
+
     @staticmethod
     def get_password_hash(password: str) -> str:
         """Generate a bcrypt hash of the password"""
@@ -28,7 +28,7 @@ class CachedUserRepository(CachedRepository[User]):
         """
         # This is a common query that benefits from caching
         # Generate cache key
-        cache_key = f"{self.prefix}:username:{username}"
+        cache_key = f"{self.prefix}:username:{username.lower()}"
         
         # Try to get from cache if Redis is available
         if self.redis:
@@ -43,7 +43,7 @@ class CachedUserRepository(CachedRepository[User]):
                     return self.get_by_id(db, data['id'])
         
         # Not in cache, query database
-        user = db.query(User).filter(User.username == username).first()
+        user = db.query(User).filter(User.username_lower == username.lower()).first()
         
         # Store in cache if found and Redis is available
         if user and self.redis:
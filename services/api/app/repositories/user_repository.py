@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from ..models import User
 from typing import List, Optional
 from ..db_tracing import traced_db_operation
+from ..auth import invalidate_cached_user
 
 class UserRepository:
     """Repository for User entity with traced database operations"""
@@ -24,8 +25,8 @@ class UserRepository:
     @staticmethod
     @traced_db_operation("get_user_by_username")
     def get_user_by_username(db: Session, username: str) -> Optional[User]:
-        """Get a user by username with tracing"""
-        return db.query(User).filter(User.username == username).first()
+        """Get a user by username (case-insensitive) with tracing"""
+        return db.query(User).filter(User.username_lower == username.lower()).first()
     
     @staticmethod
     @traced_db_operation("get_user_by_email")
@@ -51,12 +52,18 @@ class UserRepository:
         if not db_user:
             return None
             
+        old_username = db_user.username
         for key, value in user_data.items():
             if hasattr(db_user, key):
                 setattr(db_user, key, value)
                 
         db.commit()
         db.refresh(db_user)
+        # Only after the commit, so a concurrent login can't re-cache the old row;
+        # a rename has to drop both names
+        invalidate_cached_user(old_username)
+        if db_user.username != old_username:
+            invalidate_cached_user(db_user.username)
         return db_user
     
     @staticmethod
@@ -67,6 +74,8 @@ class UserRepository:
         if not db_user:
             return False
             
+        username = db_user.username
         db.delete(db_user)
         db.commit()
+        invalidate_cached_user(username)
         return True
@@ -48,7 +48,7 @@ def get_user_by_username(db: Session, username: str):
     if repository_available:
         return UserRepository.get_user_by_username(db, username)
     else:
-        return db.query(models.User).filter(models.User.username == username).first()
+        return db.query(models.User).filter(models.User.username_lower == username.lower()).first()
 
 def get_user_by_id(db: Session, user_id: int):
     if repository_available:
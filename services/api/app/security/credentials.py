@@ -57,6 +57,11 @@ class CredentialManager:
             
         return db_url
     
+    @staticmethod
+    def get_redis_unix_socket() -> Optional[str]:
+        """Path of a same-host Redis unix socket, if one is configured"""
+        return CredentialManager.get_secret("REDIS_UNIX_SOCKET", default=None, log_warning=False)
+    
     @staticmethod
     def get_redis_url() -> str:
         """Build a Redis URL from components or return the complete URL"""
@@ -76,6 +81,12 @@ class CredentialManager:
                 redis_url = f"redis://:{redis_password}@{redis_host}:{redis_port}"
             else:
                 redis_url = f"redis://{redis_host}:{redis_port}"
+        
+        # A unix socket replaces host and port for a Redis on the same host
+        redis_unix_socket = CredentialManager.get_redis_unix_socket()
+        if redis_unix_socket:
+            password_part = f":{redis_password}@" if redis_password else ""
+            redis_url = f"unix://{password_part}{redis_unix_socket}"
                 
         return redis_url
     
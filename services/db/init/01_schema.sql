@@ -4,11 +4,15 @@
 -- Enable UUID extension for generating unique IDs
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable pgcrypto so sample data can be seeded with real bcrypt hashes
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
 -- Create users table with proper constraints
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
     email VARCHAR(255) UNIQUE NOT NULL,
     username VARCHAR(100) UNIQUE NOT NULL,
+    username_lower VARCHAR(100) UNIQUE NOT NULL,
     hashed_password VARCHAR(255) NOT NULL,
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
@@ -58,6 +62,7 @@ COMMENT ON TABLE users IS 'Users of the application';
 COMMENT ON COLUMN users.id IS 'Unique identifier for the user';
 COMMENT ON COLUMN users.email IS 'User''s email address, must be unique';
 COMMENT ON COLUMN users.username IS 'User''s chosen username, must be unique';
+COMMENT ON COLUMN users.username_lower IS 'Lowercased username for case-insensitive lookups';
 COMMENT ON COLUMN users.hashed_password IS 'Securely hashed password';
 COMMENT ON COLUMN users.is_active IS 'Whether the user account is active';
 COMMENT ON COLUMN users.created_at IS 'Timestamp when the user was created';
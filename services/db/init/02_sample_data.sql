@@ -2,13 +2,13 @@
 -- Populating the database with sample data
 
 -- Insert sample users 
--- Admin has a proper bcrypt hash for password "admin123"
-INSERT INTO users (email, username, hashed_password)
+-- Passwords are bcrypt-hashed at seed time so logins only need a single verify
+INSERT INTO users (email, username, username_lower, hashed_password)
 VALUES 
-    ('admin@example.com', 'admin', '$2b$12$ncfueSK6XCJdS6.A8tpiq.itDi/S4yOuf.bYAvAPgNnPgdRrMT.ci'),
-    ('user1@example.com', 'user1', 'user123_hashed'),
-    ('user2@example.com', 'user2', 'user234_hashed'),
-    ('demo@example.com', 'demo', 'demo123_hashed')
+    ('admin@example.com', 'admin', 'admin', crypt('admin123', gen_salt('bf', 12))),
+    ('user1@example.com', 'user1', 'user1', crypt('user123', gen_salt('bf', 12))),
+    ('user2@example.com', 'user2', 'user2', crypt('user234', gen_salt('bf', 12))),
+    ('demo@example.com', 'demo', 'demo', crypt('demo123', gen_salt('bf', 12)))
 ON CONFLICT (email) DO NOTHING;
 
 -- Insert sample items
@@ -0,0 +1,58 @@
+-- db/migrations/001_username_lower.sql
+-- Add the lowercased username column to databases created before it existed.
+-- The init scripts only run on an empty data volume, so apply this once with
+-- `./microservices migrate`. It is safe to run again.
+
+BEGIN;
+
+-- username_lower must be unique, so stop before changing anything if existing
+-- usernames differ only by case
+DO $$
+DECLARE
+    collisions TEXT;
+BEGIN
+    SELECT string_agg(format('%s (%s)', lowered, names), '; ')
+    INTO collisions
+    FROM (
+        SELECT lower(username) AS lowered,
+               string_agg(format('id %s: %s', id, username), ', ' ORDER BY id) AS names
+        FROM users
+        GROUP BY lower(username)
+        HAVING count(*) > 1
+    ) duplicates;
+
+    IF collisions IS NOT NULL THEN
+        RAISE EXCEPTION 'usernames collide when lowercased: %', collisions
+            USING HINT = 'Rename or merge these users so each lowercased username is unique, then run the migration again.';
+    END IF;
+END
+$$;
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS username_lower VARCHAR(100);
+
+UPDATE users
+SET username_lower = lower(username)
+WHERE username_lower IS DISTINCT FROM lower(username);
+
+ALTER TABLE users ALTER COLUMN username_lower SET NOT NULL;
+
+-- Fresh databases already have the constraint from 01_schema.sql
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'users'::regclass
+          AND i.indisunique
+          AND i.indnatts = 1
+          AND a.attname = 'username_lower'
+    ) THEN
+        ALTER TABLE users ADD CONSTRAINT users_username_lower_key UNIQUE (username_lower);
+    END IF;
+END
+$$;
+
+COMMENT ON COLUMN users.username_lower IS 'Lowercased username for case-insensitive lookups';
+
+COMMIT;
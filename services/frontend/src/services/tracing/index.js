@@ -3,7 +3,7 @@ import React from 'react';
 import { trace, context, propagation } from '@opentelemetry/api';
 import { WebTracerProvider } from '@opentelemetry/sdk-trace-web';
 import { Resource } from '@opentelemetry/resources';
-import { SimpleSpanProcessor } from '@opentelemetry/sdk-trace-base';
+import { SimpleSpanProcessor, ParentBasedSampler, TraceIdRatioBasedSampler } from '@opentelemetry/sdk-trace-base';
 import { OTLPTraceExporter } from '@opentelemetry/exporter-trace-otlp-http';
 import { ZoneContextManager } from '@opentelemetry/context-zone';
 import { registerInstrumentations } from '@opentelemetry/instrumentation';
@@ -17,6 +17,8 @@ import { SemanticResourceAttributes } from '@opentelemetry/semantic-conventions'
 const OTEL_ENABLED = process.env.REACT_APP_OTEL_ENABLED === 'true';
 const OTEL_ENDPOINT = process.env.REACT_APP_OTEL_ENDPOINT || '/api/v1/traces';
 const SERVICE_NAME = process.env.REACT_APP_SERVICE_NAME || 'frontend-service';
+// Fraction of new traces to sample (0.0-1.0), set with `./microservices sampling-rate`
+const SAMPLING_RATIO = parseFloat(process.env.REACT_APP_OTEL_SAMPLING_RATIO || '1');
 
 let isInitialized = false;
 let tracerProvider = null;
@@ -42,6 +44,9 @@ export function initTracing() {
     // Create a tracer provider
     tracerProvider = new WebTracerProvider({
       resource,
+      sampler: new ParentBasedSampler({
+        root: new TraceIdRatioBasedSampler(SAMPLING_RATIO),
+      }),
     });
 
     // Configure span processor and exporter